@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+appstore.py
+
+applications.db: every job that ever appeared in a Sheets export, keyed by
+canonical_key(apply_url), with its latest status, the status each imported
+file recorded for it (history) and which file that was (provenance).
+
+Every change to a job's funnel status (not applied -> applied -> interview ...)
+is appended to an event log as the export that shows it is imported; the
+per-status and per-company counts are materialized from that log and only
+catch up on events added since the last report.
+
+compare_applied, detailed_analysis, count_applications and pull_apply_links
+query this store instead of walking the CSV files. Each export is imported
+once: files are identified by content hash, so re-running an import, or
+importing an export again after moving it into past_applied_data/, is a no-op.
+
+Usage:
+    python appstore.py import new_grad_swe_apply_links_applying.csv
+    python appstore.py sync      # import new/changed files from past_applied_data/ + the current sheet
+    python appstore.py stats
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from urlnorm import KEY_COLUMN, canonical_key
+
+DB_FILE = "applications.db"
+CURRENT_FILE = "new_grad_swe_apply_links_applying.csv"
+PAST_FOLDER = "past_applied_data"
+APPLIED_TRUE = {"TRUE", "YES", "Y", "1"}
+# a status containing any of these means the application was sent
+STATUS_KEYWORDS = ("appl", "submitted", "interview", "offer", "accepted", "hired")
+
+# ---------------- Header detection ----------------
+def find_header_fieldname_map(fieldnames: List[str]) -> Dict[str, str]:
+    """
+    Build a map of normalized header -> original header name.
+    Normalized header is header.strip().lower()
+    """
+    return { (h or "").strip().lower(): h for h in (fieldnames or []) }
+
+def detect_url_key(fieldnames: List[str]) -> Optional[str]:
+    """Return the header name that's most likely the URL/apply link column."""
+    if not fieldnames:
+        return None
+    for h in fieldnames:
+        hn = (h or "").strip().lower()
+        if hn == "apply_url" or hn == "apply-url" or hn == "apply url":
+            return h
+    for h in fieldnames:
+        hn = (h or "").strip().lower()
+        if "apply" in hn and ("url" in hn or "link" in hn):
+            return h
+    for h in fieldnames:
+        hn = (h or "").strip().lower()
+        if "url" in hn or "link" in hn:
+            return h
+    return None
+
+def detect_applied_key(fieldnames: List[str]) -> Optional[str]:
+    """Return the header that looks like an 'Applied' flag column (if any)."""
+    if not fieldnames:
+        return None
+    for h in fieldnames:
+        hn = (h or "").strip().lower()
+        if hn in ("applied", "applied?"):
+            return h
+    for h in fieldnames:
+        hn = (h or "").strip().lower()
+        if "appl" in hn and ("date" not in hn):  # prefer plain Applied over "Date Applied"
+            return h
+    return None
+
+def detect_date_key(fieldnames: List[str]) -> Optional[str]:
+    for h in fieldnames:
+        if "date applied" == (h or "").strip().lower() or "date_applied" == (h or "").strip().lower():
+            return h
+    # fallback to any header containing "date"
+    for h in fieldnames:
+        if "date" in (h or "").strip().lower():
+            return h
+    return None
+
+def detect_status_key(fieldnames: List[str]) -> Optional[str]:
+    for h in fieldnames:
+        if (h or "").strip().lower() == "status":
+            return h
+    return None
+
+def funnel_status(applied: bool, status: str) -> Optional[str]:
+    """A job's place in the funnel: None until applied, then its status ('applied' while blank)."""
+    return (status or "applied") if applied else None
+
+def is_applied(applied_val: str, date_val: str, status_val: str) -> bool:
+    """The one rule for "was this job applied to": Applied checkbox, a Date Applied, or an applied-like Status."""
+    if (applied_val or "").strip().upper() in APPLIED_TRUE:
+        return True
+    if (date_val or "").strip():
+        return True
+    st = (status_val or "").strip().lower()
+    return any(k in st for k in STATUS_KEYWORDS)
+
+# ---------------- Reading exports ----------------
+class ExportRow(NamedTuple):
+    key: str
+    apply_url: str
+    company: str
+    title: str
+    location: str
+    applied: bool
+    status: str             # stripped, lowercased
+    date_applied: str
+
+def read_export(path: str) -> List[ExportRow]:
+    """Rows of one Sheets export (or archive) with a URL; the first row per canonical key wins."""
+    out: Dict[str, ExportRow] = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+        url_key = detect_url_key(fields)
+        if not url_key:
+            return []
+        applied_key, date_key, status_key = detect_applied_key(fields), detect_date_key(fields), detect_status_key(fields)
+        hmap = find_header_fieldname_map(fields)
+        company_key, title_key, location_key = hmap.get("company"), hmap.get("title"), hmap.get("location")
+        has_key_col = KEY_COLUMN in fields
+        for row in reader:
+            raw = (row.get(url_key) or "").strip()
+            if not raw:
+                continue
+            # reuse the key pull_apply_links stored, if the export kept the column
+            key = ((row.get(KEY_COLUMN) or "").strip() if has_key_col else "") or canonical_key(raw)
+            def cell(k: Optional[str]) -> str:
+                return (row.get(k) or "").strip() if k else ""
+            applied_val, date_val, status_val = cell(applied_key), cell(date_key), cell(status_key)
+            r = ExportRow(key, raw, cell(company_key), cell(title_key), cell(location_key),
+                          is_applied(applied_val, date_val, status_val), status_val.lower(), date_val)
+            first = out.get(key)
+            if first is not None:
+                # the same job listed twice: keep the first row, but don't lose an applied mark
+                r = first._replace(applied=first.applied or r.applied, status=first.status or r.status,
+                                   date_applied=first.date_applied or r.date_applied)
+            out[key] = r
+    return list(out.values())
+
+def _read_export_or_none(path: str) -> Optional[List[ExportRow]]:
+    """read_export(), or None for an unreadable file (one corrupt CSV shouldn't stop a sync)."""
+    try:
+        return read_export(path)
+    except (OSError, UnicodeDecodeError, csv.Error):
+        return None
+
+def natural_key(path: str) -> Tuple:
+    """Sort applying_2.csv before applying_10.csv, so archives import oldest first."""
+    return tuple(int(p) if p.isdigit() else p for p in re.split(r"(\d+)", path))
+
+def sha1_file(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+# ---------------- Store ----------------
+class ImportResult(NamedTuple):
+    path: str
+    rows: int               # rows with a URL (0 when skipped)
+    new_jobs: int
+    skipped: bool           # already imported (same content)
+
+class ApplicationStore:
+    """
+    jobs:    one row per canonical key; applied is sticky, status is the non-empty
+             one from the newest export (by file mtime), applied_on the Date
+             Applied (or the export's date).
+    history: the row each imported file had for a job (status history + provenance).
+    files:   imported files by content hash, with where and when they were seen.
+    events:  append-only log of funnel_status() changes (old NULL = newly applied),
+             stamped with the export's mtime.
+    funnel / funnel_companies: applied jobs per status / company, folded from
+             events up to meta.funnel_event by refresh_funnel().
+    meta:    funnel_event, and store_id (a random id made when the database is).
+    Exports may be imported in any order: one older than a job's last export
+    only fills in what that export left blank and logs no status transitions.
+    `key in store` is true for applied jobs only.
+    """
+    def __init__(self, db_path: str = DB_FILE):
+        self.path = db_path
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY, sha1 TEXT UNIQUE NOT NULL, path TEXT NOT NULL,
+                mtime_ns INTEGER, size INTEGER, imported_at REAL, rows INTEGER);
+            CREATE INDEX IF NOT EXISTS files_path ON files (path);
+            CREATE TABLE IF NOT EXISTS jobs (
+                key TEXT PRIMARY KEY, apply_url TEXT NOT NULL,
+                company TEXT NOT NULL DEFAULT '', title TEXT NOT NULL DEFAULT '', location TEXT NOT NULL DEFAULT '',
+                applied INTEGER NOT NULL DEFAULT 0, status TEXT NOT NULL DEFAULT '', applied_on TEXT,
+                first_file INTEGER REFERENCES files (id), last_file INTEGER REFERENCES files (id));
+            CREATE INDEX IF NOT EXISTS jobs_company ON jobs (company);
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+            CREATE INDEX IF NOT EXISTS jobs_applied_on ON jobs (applied_on);
+            CREATE TABLE IF NOT EXISTS history (
+                key TEXT NOT NULL, file_id INTEGER NOT NULL REFERENCES files (id),
+                applied INTEGER NOT NULL, status TEXT NOT NULL, date_applied TEXT NOT NULL,
+                PRIMARY KEY (key, file_id)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS history_file ON history (file_id);
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY, key TEXT NOT NULL, old_status TEXT, new_status TEXT NOT NULL,
+                file_id INTEGER REFERENCES files (id), at REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS events_key ON events (key);
+            CREATE TABLE IF NOT EXISTS funnel (status TEXT PRIMARY KEY, n INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS funnel_companies (company TEXT PRIMARY KEY, n INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value) WITHOUT ROWID;
+        """)
+        with self.db:
+            if self._meta("funnel_event") is None:
+                self._backfill_events()
+                self.db.execute("INSERT INTO meta (name, value) VALUES ('funnel_event', 0)")
+            if self._meta("store_id") is None:
+                self.db.execute("INSERT INTO meta (name, value) VALUES ('store_id', ?)", (uuid.uuid4().hex,))
+        # random per database file: files derived from it (the Bloom filter) check they belong to this one
+        self.store_id: str = self._meta("store_id")
+
+    def _meta(self, name: str):
+        row = self.db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _backfill_events(self) -> None:
+        # a store written before the event log existed: one event per applied job, as of its last export
+        self.db.execute("""
+            INSERT INTO events (key, old_status, new_status, file_id, at)
+            SELECT j.key, NULL, CASE WHEN j.status = '' THEN 'applied' ELSE j.status END, j.last_file, f.mtime_ns / 1e9
+            FROM jobs j JOIN files f ON f.id = j.last_file WHERE j.applied ORDER BY j.rowid
+        """)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _unchanged(self, path: str, st: os.stat_result) -> bool:
+        row = self.db.execute("SELECT mtime_ns, size FROM files WHERE path = ? ORDER BY id DESC LIMIT 1",
+                              (path,)).fetchone()
+        return row is not None and tuple(row) == (st.st_mtime_ns, st.st_size)
+
+    def import_file(self, path: str, rows: Optional[List[ExportRow]] = None) -> ImportResult:
+        """Import one export unless its content is already in the store (rows: pre-parsed read_export(path))."""
+        st = os.stat(path)
+        if self._unchanged(path, st):
+            return ImportResult(path, 0, 0, True)
+        digest = sha1_file(path)
+        with self.db:
+            known = self.db.execute("SELECT id FROM files WHERE sha1 = ?", (digest,)).fetchone()
+            if known:
+                # same content seen under another name (e.g. moved into the archive folder): remember the new place
+                self.db.execute("UPDATE files SET path = ?, mtime_ns = ?, size = ? WHERE id = ?",
+                                (path, st.st_mtime_ns, st.st_size, known[0]))
+                return ImportResult(path, 0, 0, True)
+            if rows is None:
+                rows = read_export(path)
+            file_id = self.db.execute(
+                "INSERT INTO files (sha1, path, mtime_ns, size, imported_at, rows) VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, path, st.st_mtime_ns, st.st_size, time.time(), len(rows))).lastrowid
+            before = self.job_count()
+            older = self._append_events(rows, file_id, st.st_mtime_ns)
+            # an export without dates still says when it was made
+            export_day = time.strftime("%Y-%m-%d", time.localtime(st.st_mtime))
+            # :newer is false when the job was last seen in a more recent export (an archive synced after
+            # the current sheet): then the stored values win and this export only fills in blanks
+            self.db.executemany("""
+                INSERT INTO jobs (key, apply_url, company, title, location, applied, status, applied_on, first_file, last_file)
+                VALUES (:key, :apply_url, :company, :title, :location, :applied, :status, :applied_on, :file_id, :file_id)
+                ON CONFLICT (key) DO UPDATE SET
+                    apply_url = CASE WHEN :newer THEN excluded.apply_url ELSE apply_url END,
+                    company = CASE WHEN excluded.company != '' AND (:newer OR company = '') THEN excluded.company ELSE company END,
+                    title = CASE WHEN excluded.title != '' AND (:newer OR title = '') THEN excluded.title ELSE title END,
+                    location = CASE WHEN excluded.location != '' AND (:newer OR location = '') THEN excluded.location ELSE location END,
+                    applied = MAX(applied, excluded.applied),
+                    status = CASE WHEN excluded.status != '' AND (:newer OR status = '') THEN excluded.status ELSE status END,
+                    applied_on = CASE WHEN :newer THEN COALESCE(applied_on, excluded.applied_on)
+                                      ELSE COALESCE(excluded.applied_on, applied_on) END,
+                    last_file = CASE WHEN :newer THEN excluded.last_file ELSE last_file END
+            """, ({"key": r.key, "apply_url": r.apply_url, "company": r.company, "title": r.title, "location": r.location,
+                   "applied": int(r.applied), "status": r.status,
+                   "applied_on": (r.date_applied or export_day) if r.applied else None,
+                   "file_id": file_id, "newer": r.key not in older} for r in rows))
+            self.db.executemany("INSERT INTO history (key, file_id, applied, status, date_applied) VALUES (?, ?, ?, ?, ?)",
+                                ((r.key, file_id, int(r.applied), r.status, r.date_applied) for r in rows))
+        return ImportResult(path, len(rows), self.job_count() - before, False)
+
+    def _append_events(self, rows: List[ExportRow], file_id: int, mtime_ns: int) -> Set[str]:
+        """
+        Log the funnel changes this export makes, by diffing it against the jobs it updates (before the upsert).
+        Returns the keys whose job was last seen in a newer export: for those only a first applied mark is
+        an event, the older status is history, not a transition.
+        """
+        self.db.execute("CREATE TEMP TABLE IF NOT EXISTS incoming (key TEXT PRIMARY KEY, applied INTEGER, status TEXT)")
+        self.db.execute("DELETE FROM incoming")
+        self.db.executemany("INSERT OR IGNORE INTO incoming VALUES (?, ?, ?)",
+                            ((r.key, int(r.applied), r.status) for r in rows))
+        events = []
+        older = set()
+        for key, applied, status, old_applied, old_status, last_mtime in self.db.execute("""
+                SELECT i.key, i.applied, i.status, j.applied, j.status, f.mtime_ns
+                FROM incoming i LEFT JOIN jobs j USING (key) LEFT JOIN files f ON f.id = j.last_file"""):
+            old = funnel_status(bool(old_applied), old_status or "")
+            # same merge as the jobs upsert: applied is sticky, the newer export's non-blank status wins
+            if last_mtime is not None and last_mtime > mtime_ns:
+                older.add(key)
+                new = funnel_status(bool(applied or old_applied), old_status or status or "")
+            else:
+                new = funnel_status(bool(applied or old_applied), status or old_status or "")
+            if new is not None and new != old:
+                events.append((key, old, new, file_id, mtime_ns / 1e9))
+        self.db.executemany("INSERT INTO events (key, old_status, new_status, file_id, at) VALUES (?, ?, ?, ?, ?)", events)
+        return older
+
+    def refresh_funnel(self) -> int:
+        """Fold events logged since the last refresh into the funnel counts; returns how many were folded."""
+        cursor = self._meta("funnel_event")
+        new = self.db.execute("""
+            SELECT e.id, e.old_status, e.new_status, CASE WHEN j.company = '' THEN 'Unknown' ELSE j.company END
+            FROM events e JOIN jobs j USING (key) WHERE e.id > ? ORDER BY e.id
+        """, (cursor,)).fetchall()
+        if not new:
+            return 0
+        statuses: Dict[str, int] = {}
+        companies: Dict[str, int] = {}
+        for _, old, status, company in new:
+            if old is None:
+                companies[company] = companies.get(company, 0) + 1
+            else:
+                statuses[old] = statuses.get(old, 0) - 1
+            statuses[status] = statuses.get(status, 0) + 1
+        upsert = "INSERT INTO {0} VALUES (?, ?) ON CONFLICT ({1}) DO UPDATE SET n = n + excluded.n"
+        with self.db:
+            self.db.executemany(upsert.format("funnel", "status"), statuses.items())
+            self.db.executemany(upsert.format("funnel_companies", "company"), companies.items())
+            self.db.execute("UPDATE meta SET value = ? WHERE name = 'funnel_event'", (new[-1][0],))
+        return len(new)
+
+    def sync(self, paths: Iterable[str], workers: int = 1) -> List[ImportResult]:
+        """
+        Import every path that is new or changed since it was last seen, in the given order.
+        Exports are parsed on a process pool when workers > 1.
+        """
+        paths = [p for p in paths if os.path.exists(p)]
+        todo = [p for p in paths if not self._unchanged(p, os.stat(p))]
+        if workers > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                parsed = list(ex.map(_read_export_or_none, todo, chunksize=max(1, len(todo) // (workers * 4))))
+        else:
+            parsed = [_read_export_or_none(p) for p in todo]
+        results = [self.import_file(p, rows) for p, rows in zip(todo, parsed) if rows is not None]
+        done = {r.path for r in results}
+        return results + [ImportResult(p, 0, 0, True) for p in paths if p not in done]
+
+    # ---- queries ----
+    def __contains__(self, key: str) -> bool:
+        return self.db.execute("SELECT 1 FROM jobs WHERE key = ? AND applied", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.applied_count()
+
+    def job_count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def applied_count(self) -> int:
+        return sum(self.status_counts().values())
+
+    def status_counts(self) -> Dict[str, int]:
+        """Applied jobs per latest status ('applied' when the status is blank)."""
+        self.refresh_funnel()
+        return dict(self.db.execute("SELECT status, n FROM funnel WHERE n > 0"))
+
+    def company_counts(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Applied jobs per company (as named when first applied), most first (ties in order of first appearance)."""
+        self.refresh_funnel()
+        sql = "SELECT company, n FROM funnel_companies WHERE n > 0 ORDER BY n DESC, rowid"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [tuple(r) for r in self.db.execute(sql)]
+
+    def transitions(self, key: str) -> List[Tuple[Optional[str], str, float]]:
+        """(old_status, new_status, at) for one job, oldest first."""
+        return [tuple(r) for r in self.db.execute(
+            "SELECT old_status, new_status, at FROM events WHERE key = ? ORDER BY id", (key,))]
+
+    def applied_jobs(self, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        cur = self.db.execute("SELECT company, title, location, apply_url, status, applied_on FROM jobs "
+                              "WHERE applied ORDER BY rowid" + (f" LIMIT {int(limit)}" if limit is not None else ""))
+        cols = [d[0] for d in cur.description]
+        return [dict(zip(cols, r)) for r in cur]
+
+    def files(self) -> List[Tuple[str, int, float]]:
+        return [tuple(r) for r in self.db.execute("SELECT path, rows, imported_at FROM files ORDER BY id")]
+
+def export_paths(current_file: str = CURRENT_FILE, past_folder: str = PAST_FOLDER) -> List[str]:
+    """Archives oldest first, then the current sheet (the newest export)."""
+    paths = sorted(glob.glob(os.path.join(past_folder, "*.csv")), key=natural_key)
+    if os.path.exists(current_file):
+        paths.append(current_file)
+    return paths
+
+def print_import_summary(results: List[ImportResult]) -> None:
+    imported = [r for r in results if not r.skipped]
+    print(f"Store: imported {len(imported)} export(s) ({sum(r.rows for r in imported)} rows, "
+          f"{sum(r.new_jobs for r in imported)} new jobs), {len(results) - len(imported)} already imported.")
+
+# ---------------- Main ----------------
+def main():
+    parser = argparse.ArgumentParser(description="Import Sheets exports into applications.db and inspect it.")
+    parser.add_argument("--db", default=DB_FILE, help=f"Store path (default: {DB_FILE})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="Import one or more CSV exports, oldest first")
+    p_import.add_argument("files", nargs="+")
+    p_sync = sub.add_parser("sync", help="Import new/changed archives and the current sheet")
+    p_sync.add_argument("--current", default=CURRENT_FILE, help=f"Current applying CSV (default: {CURRENT_FILE})")
+    p_sync.add_argument("--past-folder", default=PAST_FOLDER, help=f"Archive folder (default: {PAST_FOLDER})")
+    p_sync.add_argument("--workers", type=int, default=1, help="Parse exports on N processes (default: 1)")
+    sub.add_parser("stats", help="Print what the store holds")
+    args = parser.parse_args()
+
+    store = ApplicationStore(args.db)
+    try:
+        if args.command == "import":
+            missing = [p for p in args.files if not os.path.exists(p)]
+            if missing:
+                parser.error(f"no such file: {', '.join(missing)}")
+            print_import_summary([store.import_file(p) for p in args.files])
+        elif args.command == "sync":
+            print_import_summary(store.sync(export_paths(args.current, args.past_folder), args.workers))
+        else:
+            events = store.db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            print(f"{store.job_count()} jobs, {store.applied_count()} applied, from {len(store.files())} export(s); "
+                  f"{events} status change(s) logged.")
+            for status, n in sorted(store.status_counts().items()):
+                print(f" - {status:20} {n}")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+bench.py
+
+Micro-benchmarks for the scraper/analysis hot paths, run against synthetic data
+so they work offline. Each benchmark checks that the fast path returns the same
+result as the reference path before printing timings.
+
+Usage:
+    python bench.py                # run everything
+    python bench.py parse --rows 10000
+"""
+import argparse
+import csv
+import os
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List
+
+import appstore
+import bloom
+import compare_applied
+import neardup
+import detailed_analysis
+import pull_apply_links
+import snapshot
+import urlnorm
+from fixtures import (ATS_URLS, AGES, LOCATION_CORPUS, LOCATIONS, TITLES, clean_md_text_reference,
+                      detect_flags_reference, is_us_location_reference, strip_flag_emojis_reference,
+                      synthetic_html_table, synthetic_readme)
+
+# ---------- Synthetic data ----------
+def age_to_days_reference(s):
+    """The original chained-replace version (plural spellings fall through to None)."""
+    s = (s or "").strip().lower()
+    if not s:
+        return None
+    s = (s.replace("mth", "mo")
+         .replace("year", "yr").replace("years", "yr")
+         .replace("month", "mo").replace("months", "mo")
+         .replace("week", "w").replace("weeks", "w")
+         .replace("day", "d").replace("days", "d")
+         .replace("hour", "h").replace("hours", "h"))
+    m = re.search(r"\b(\d+)\s*(h|d|w|mo|yr|y)\b", s) or re.search(r"\b(\d+)(h|d|w|mo|yr|y)\b", s)
+    if not m:
+        return None
+    n, unit = int(m.group(1)), m.group(2)
+    if unit == "y": unit = "yr"
+    return {"h": 0, "d": n, "w": n * 7, "mo": n * 30, "yr": n * 365}.get(unit, None)
+
+def synthetic_rows(n: int, seed: int = 6):
+    """Parsed-row dicts as parse_markdown_table() yields them, without paying for the parse."""
+    rnd = random.Random(seed)
+    flag_names = pull_apply_links.FLAG_NAMES
+    for i in range(n):
+        yield {
+            "company": f"Company {rnd.randrange(2000)}", "title": rnd.choice(TITLES).split(" 🇺🇸")[0] + f" {i % 97}",
+            "location": rnd.choice(LOCATIONS), "apply_url": rnd.choice(ATS_URLS).format(i=rnd.randrange(n)),
+            "age": rnd.choice([None, 0, 1, 3, 5, 8, 14, 30]),
+            **{name: rnd.random() < 0.15 for name in flag_names},
+        }
+
+def dedupe_dicts(rows):
+    """dedupe / filter_rows / sort_rows as they worked on List[Dict], for comparison."""
+    out, seen = [], set()
+    for r in rows:
+        key = urlnorm.canonical_key(r["apply_url"])
+        if key in seen: continue
+        seen.add(key)
+        job = urlnorm.ats_job(r["apply_url"])
+        if job is not None:
+            if job.key in seen: continue
+            seen.add(job.key)
+        out.append(r)
+    return out
+
+def filter_dicts(rows, applied_urls, max_age_days):
+    out = []
+    for r in rows:
+        if r.get("closed") or r.get("advanced_degree"):
+            continue
+        if urlnorm.canonical_key(r["apply_url"]) in applied_urls:
+            continue
+        age = r.get("age")
+        if age is None or age > max_age_days:
+            continue
+        if not pull_apply_links.is_us_location(r.get("location", "")):
+            continue
+        out.append(r)
+    return out
+
+def sort_dicts(rows):
+    return sorted(rows, key=lambda r: (
+        0 if r.get("no_sponsorship") else 1, 0 if r.get("requires_us_citizenship") else 1,
+        0 if r.get("faang_plus") else 1, (r.get("company") or "zzz").lower(),
+        (r.get("title") or "zzz").lower(), (r.get("location") or "zzz").lower()))
+
+def synthetic_urls(n: int, distinct: int, seed: int = 4) -> List[str]:
+    """n URLs drawn from `distinct` jobs, so repeats look like archives re-read run after run."""
+    rnd = random.Random(seed)
+    return [rnd.choice(ATS_URLS).format(i=rnd.randrange(distinct)) for _ in range(n)]
+
+ARCHIVE_HEADERS = [
+    ["flags", "company", "title", "location", "apply_url", "age", "Applied", "Status"],
+    ["Company", "Title", "Apply URL", "Date Applied", "Status"],
+]
+STATUSES = ["", "Applied", "Interview", "Offer", "Rejected", "Submitted"]
+
+def write_synthetic_archives(folder: str, n_files: int, rows_per_file: int, seed: int = 5) -> None:
+    """Archives named like past_applied_data/ exports, with overlapping jobs between files."""
+    rnd = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    distinct = max(1, n_files * rows_per_file // 2)
+    for i in range(n_files):
+        header = ARCHIVE_HEADERS[i % len(ARCHIVE_HEADERS)]
+        with open(os.path.join(folder, f"new_grad_swe_apply_links_applying_{i + 1}.csv"), "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(header)
+            for _ in range(rows_per_file):
+                j = rnd.randrange(distinct)
+                url = rnd.choice(ATS_URLS).format(i=j)
+                values = {"company": f"Company {j % 300}", "Company": f"Company {j % 300}",
+                          "title": "Software Engineer", "Title": "Software Engineer",
+                          "apply_url": url, "Apply URL": url, "location": "NYC", "age": "1",
+                          "Applied": rnd.choice(["TRUE", "FALSE"]), "Date Applied": rnd.choice(["", "2025-01-02"]),
+                          "Status": rnd.choice(STATUSES)}
+                w.writerow([values.get(h, "") for h in header])
+
+# ---------- Helpers ----------
+def timed(fn: Callable, repeat: int = 3):
+    """Best-of-N wall time in seconds, plus the last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def report(name: str, n: int, before: float, after: float, unit: str = "rows"):
+    print(f"{name:28} {n:>8} {unit:6} before {n / before:>12,.0f}/s   after {n / after:>12,.0f}/s   x{before / after:.1f}")
+
+# ---------- Benchmarks ----------
+def bench_parse(args):
+    """parse_markdown_table with the cell tokenizer vs. per-row BeautifulSoup."""
+    section = pull_apply_links.extract_active_swe(synthetic_readme(args.rows))
+    fast = pull_apply_links.scan_html_fragment
+    pull_apply_links.scan_html_fragment = pull_apply_links._scan_html_fragment_bs4
+    try:
+        before, ref = timed(lambda: pull_apply_links.parse_markdown_table(section), args.repeat)
+    finally:
+        pull_apply_links.scan_html_fragment = fast
+    after, got = timed(lambda: pull_apply_links.parse_markdown_table(section), args.repeat)
+    assert got == ref, "cell tokenizer changed parse_markdown_table output"
+    report("parse_markdown_table", args.rows, before, after)
+
+def bench_location(args):
+    """is_us_location: compiled alternations + LRU memo vs. per-call regex builds."""
+    rnd = random.Random(2)
+    corpus = [rnd.choice(LOCATION_CORPUS) for _ in range(args.rows * 10)]
+    def run(fn):
+        return [fn(loc) for loc in corpus]
+    before, ref = timed(lambda: run(is_us_location_reference), args.repeat)
+    pull_apply_links.is_us_location.cache_clear()
+    after, got = timed(lambda: run(pull_apply_links.is_us_location), args.repeat)
+    assert got == ref
+    uncached, _ = timed(lambda: run(pull_apply_links.is_us_location.__wrapped__), args.repeat)
+    report("is_us_location", len(corpus), before, after, "calls")
+    report("  (without memo)", len(corpus), before, uncached, "calls")
+
+def bench_flags(args):
+    """detect_flags: one trie regex pass vs. a substring scan per phrase, with default and 10x phrase tables."""
+    lines = [ln for ln in synthetic_readme(args.rows).splitlines() if ln.startswith("| ") and "---" not in ln]
+    texts = [" ".join(c.strip() for c in ln.strip("|").split("|")) for ln in lines]
+    phrases = {k: list(v) for k, v in pull_apply_links.FLAG_PHRASES.items()}
+    before, ref = timed(lambda: [detect_flags_reference(t, phrases) for t in texts], args.repeat)
+    after, got = timed(lambda: [pull_apply_links.detect_flags(t) for t in texts], args.repeat)
+    assert got == ref, "detect_flags output changed"
+    report("detect_flags", len(texts), before, after)
+    # user-configured phrases: the per-phrase scan grows linearly, the automaton barely moves
+    extra = {k: [f"{w} {i}" for w in words for i in range(10)] for k, words in phrases.items()}
+    big = {k: phrases[k] + extra[k] for k in phrases}
+    saved = pull_apply_links.FLAG_MATCHER
+    pull_apply_links.FLAG_MATCHER = pull_apply_links.FlagMatcher({k: [e] for e, k in pull_apply_links.FLAG_EMOJIS.items()})
+    pull_apply_links.FLAG_MATCHER.add(big)
+    try:
+        before, ref = timed(lambda: [detect_flags_reference(t, big) for t in texts], args.repeat)
+        after, got = timed(lambda: [pull_apply_links.detect_flags(t) for t in texts], args.repeat)
+    finally:
+        pull_apply_links.FLAG_MATCHER = saved
+    assert got == ref, "detect_flags output changed with extra phrases"
+    report(f"  ({sum(map(len, big.values()))} phrases)", len(texts), before, after)
+
+def bench_urlnorm(args):
+    """canonical_keys (memoized batch) vs. strip_tracking + norm_url on every URL."""
+    urls = synthetic_urls(100000, 20000)
+    ref_fn = lambda: [urlnorm.norm_url(urlnorm.strip_tracking(u)) for u in urls]
+    before, ref = timed(ref_fn, args.repeat)
+    def cold():
+        urlnorm._URL_MEMO.clear()
+        return urlnorm.canonical_keys(urls)
+    after_cold, got = timed(cold, args.repeat)
+    assert got == ref, "canonical_keys disagrees with strip_tracking + norm_url"
+    after_warm, _ = timed(lambda: urlnorm.canonical_keys(urls), args.repeat)
+    report("canonical_keys (cold)", len(urls), before, after_cold, "urls")
+    report("canonical_keys (warm)", len(urls), before, after_warm, "urls")
+
+def bench_archives(args):
+    """Archive ingestion on 1 process vs. --workers N (compare_applied and detailed_analysis)."""
+    workers = args.workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "past_applied_data")
+        write_synthetic_archives(folder, args.archives, 500)
+        pattern = os.path.join(folder, "new_grad_swe_apply_links_applying_*.csv")
+        n_rows = args.archives * 500
+        for name, fn in (
+            ("compare_applied", lambda w: compare_applied.load_applied_urls_from_archives(pattern, w)),
+            ("detailed_analysis", lambda w: detailed_analysis.load_all_applications(os.path.join(tmp, "none.csv"), folder, w)),
+        ):
+            def serial():
+                urlnorm._URL_MEMO.clear()
+                return fn(1)
+            def parallel():
+                urlnorm._URL_MEMO.clear()
+                return fn(workers)
+            before, ref = timed(serial, args.repeat)
+            after, got = timed(parallel, args.repeat)
+            assert got == ref, f"{name} differs with workers={workers}"
+            report(f"{name} ({workers} workers)", n_rows, before, after)
+
+def bench_snapshot(args):
+    """detailed_analysis report: CSV path vs. store + snapshot rebuild (cold) vs. mmapped snapshot (warm)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "past_applied_data")
+        write_synthetic_archives(folder, args.archives, 500)
+        current = os.path.join(tmp, "none.csv")
+        paths = appstore.export_paths(current, folder)
+        db = os.path.join(tmp, "applications.db")
+        n_rows = args.archives * 500
+        def csv_path():
+            urlnorm._URL_MEMO.clear()
+            return detailed_analysis.analyze(detailed_analysis.load_all_applications(current, folder))[0]
+        def report_from_snapshot():
+            snap, _ = snapshot.open_snapshot(paths, db)
+            try:
+                return detailed_analysis.analyze_store(snap)[0]
+            finally:
+                snap.close()
+        def cold():
+            for p in (db, snapshot.snapshot_path(db)):
+                if os.path.exists(p):
+                    os.remove(p)
+            urlnorm._URL_MEMO.clear()
+            return report_from_snapshot()
+        before, ref = timed(csv_path, args.repeat)
+        after_cold, _ = timed(cold, args.repeat)
+        after_warm, got = timed(report_from_snapshot, args.repeat)
+        # the CSV path keeps the first-seen row per job, the store the latest status; the job set is the same
+        assert got["total_unique_rows"] == ref["total_unique_rows"], "snapshot and CSV path see different jobs"
+        report("analysis report (cold)", n_rows, before, after_cold)
+        report("analysis report (warm)", n_rows, before, after_warm)
+        for name, fn in (("CSV path", csv_path), ("snapshot (warm)", report_from_snapshot)):
+            tracemalloc.start()
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{'  peak memory, ' + name:28} {peak / 1e6:>9.1f} MB")
+
+def bench_bloom(args):
+    """Applied-URL check: set rebuilt from the export vs. store / snapshot, with and without the Bloom filter."""
+    n = args.applied_rows
+    with tempfile.TemporaryDirectory() as tmp:
+        export = os.path.join(tmp, "applying.csv")
+        with open(export, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["company", "title", "apply_url", "Applied"])
+            for i in range(n):
+                w.writerow([f"Company {i % 300}", "Software Engineer", ATS_URLS[i % len(ATS_URLS)].format(i=i), "TRUE"])
+        db = os.path.join(tmp, "applications.db")
+        store = appstore.ApplicationStore(db)
+        store.import_file(export)
+        snap, _ = snapshot.open_snapshot([export], db)
+        bloom.applied_bloom(store)
+        # scraped links: 10% already applied to
+        rnd = random.Random(3)
+        probes = urlnorm.canonical_keys(ATS_URLS[i % len(ATS_URLS)].format(i=rnd.randrange(n * 10)) for i in range(100000))
+        tracemalloc.start()
+        applied = set(compare_applied.read_applied_urls(export))
+        set_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        before, _ = timed(lambda: set(compare_applied.read_applied_urls(export)), args.repeat)
+        after, bf = timed(lambda: bloom.applied_bloom(store), args.repeat)
+        print(f"{'startup':28} {n:>8} keys   set from CSV {before * 1e3:>8.1f} ms   Bloom filter load {after * 1e6:>8.0f} us")
+        print(f"{'  memory':28} {n:>8} keys   set {set_bytes / 1e6:>9.1f} MB   Bloom filter {len(bf.bits) / 1e6:>9.2f} MB")
+        ref = [k in applied for k in probes]
+        for name, exact in (("store", store), ("snapshot", snap)):
+            plain, got = timed(lambda: [k in exact for k in probes], args.repeat)
+            assert got == ref, f"{name} lookups disagree with the set"
+            guard = bloom.BloomGuard(bf, exact)
+            guarded, got = timed(lambda: [k in guard for k in probes], args.repeat)
+            assert got == ref, f"{name} + Bloom lookups disagree with the set"
+            report(f"lookups: {name} + Bloom", len(probes), plain, guarded, "keys")
+        snap.close()
+        store.close()
+
+def mirrored_rows(n: int, mirror_rate: float = 0.02, seed: int = 8):
+    """
+    synthetic_rows with a few employers posting most jobs (log-uniform companies), plus, for
+    some rows, the same posting on the company's own site under a reworded title.
+    """
+    rnd = random.Random(seed)
+    rewordings = [("Software Engineer", "SWE"), (" I ", " 1 "), ("Engineer", "Engineer -")]
+    for i, row in enumerate(synthetic_rows(n)):
+        row["company"] = f"Company {int(2000 ** rnd.random())}"
+        row["apply_url"] = rnd.choice(ATS_URLS).format(i=i)    # one ATS id per posting
+        yield row
+        if rnd.random() < mirror_rate:
+            title = row["title"]
+            for a, b in rewordings:
+                title = title.replace(a, b)
+            slug = row["company"].lower().replace(" ", "")
+            yield {**row, "title": title, "apply_url": f"https://careers.{slug}.com/openings/{i}"}
+
+def pairwise_clusters(rows, threshold: float = neardup.THRESHOLD):
+    """Reference for NearDupIndex: every pair of rows in a company compared by Jaccard similarity."""
+    by_company = {}
+    for pos, (company, title, location) in enumerate(rows):
+        by_company.setdefault(company.casefold().strip(), []).append((pos, neardup.shingles(title, location)))
+    parent = list(range(len(rows)))
+    def find(x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+    for members in by_company.values():
+        for a in range(len(members)):
+            for b in range(a + 1, len(members)):
+                if neardup.jaccard(members[a][1], members[b][1]) >= threshold:
+                    ra, rb = find(members[a][0]), find(members[b][0])
+                    if ra != rb:
+                        parent[rb] = ra
+    clusters = {}
+    for pos in range(len(rows)):
+        clusters.setdefault(find(pos), []).append(pos)
+    return sorted(c for c in clusters.values() if len(c) > 1)
+
+def bench_neardup(args):
+    """Near-duplicate rows: LSH index vs. pairwise Jaccard within each company (--rows), then dedupe at 100k."""
+    def lsh(rows):
+        index = neardup.NearDupIndex()
+        for pos, (company, title, location) in enumerate(rows):
+            index.add(pos, company.casefold().strip(), title, location)
+        return sorted(index.clusters())
+    exact = pull_apply_links.dedupe(pull_apply_links.JobTable.from_rows(mirrored_rows(args.rows)), fuzzy=False)
+    rows = list(zip(exact.companies, exact.titles, exact.locations))
+    before, ref = timed(lambda: pairwise_clusters(rows), 1)
+    after, got = timed(lambda: lsh(rows), args.repeat)
+    ref_pairs = {(c[0], m) for c in ref for m in c[1:]}
+    got_pairs = {(c[0], m) for c in got for m in c[1:]}
+    print(f"{'near-dup clusters':28} {len(rows):>8} rows   pairwise {len(ref):>8}   LSH {len(got):>8}   "
+          f"recall {len(ref_pairs & got_pairs) / max(1, len(ref_pairs)):.3f}")
+    assert got_pairs <= ref_pairs or all(
+        neardup.jaccard(neardup.shingles(*rows[a][1:]), neardup.shingles(*rows[b][1:])) >= neardup.THRESHOLD
+        for a, b in got_pairs - ref_pairs), "LSH clustered rows below the threshold"
+    report("near-dup clustering", len(rows), before, after)
+    table = pull_apply_links.JobTable.from_rows(mirrored_rows(100000))
+    mirrors = sum(1 for u in table.urls if "/openings/" in u)
+    plain, _ = timed(lambda: pull_apply_links.dedupe(table, fuzzy=False), args.repeat)
+    dropped = {}
+    fuzzy, out = timed(lambda: pull_apply_links.dedupe(table, fuzzy=True, dropped=dropped), args.repeat)
+    left = sum(1 for u in out.urls if "/openings/" in u)
+    print(f"{'dedupe':28} {len(table):>8} rows   exact {plain * 1e3:>8.0f} ms   +near-dup {fuzzy * 1e3:>8.0f} ms   "
+          f"dropped {dropped['near-duplicate']} of {mirrors} mirrors ({left} kept)")
+
+def bench_table(args):
+    """JobTable (columnar) vs. List[Dict]: memory held and dedupe+filter+sort throughput at 100k rows."""
+    n = 100000
+    applied = set(urlnorm.canonical_keys(synthetic_urls(n // 10, n)))
+    def measure(build):
+        tracemalloc.start()
+        obj = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return obj, size
+    # warm the canonical_key memo first so its entries aren't billed to the table
+    urlnorm.canonical_keys(r["apply_url"] for r in synthetic_rows(n))
+    dicts, dict_bytes = measure(lambda: list(synthetic_rows(n)))
+    table, table_bytes = measure(lambda: pull_apply_links.JobTable.from_rows(synthetic_rows(n)))
+    print(f"{'row model memory':28} {n:>8} rows   dicts {dict_bytes / 1e6:>9.1f} MB   JobTable {table_bytes / 1e6:>9.1f} MB")
+    # warm the shared URL/location memos so both sides pay the same for them
+    dedupe_dicts(dicts)
+    before, ref = timed(lambda: sort_dicts(filter_dicts(dedupe_dicts(dicts), applied, 30)), args.repeat)
+    after, got = timed(lambda: pull_apply_links.sort_rows(pull_apply_links.filter_rows(pull_apply_links.dedupe(table, fuzzy=False), applied, 30)), args.repeat)
+    assert [r["apply_url"] for r in ref] == got.urls, "JobTable pipeline changed the result"
+    report("dedupe+filter+sort", n, before, after)
+
+def bench_age(args):
+    """age_to_days: one precompiled regex + memo vs. chained replaces and two regexes per call."""
+    rnd = random.Random(7)
+    corpus = [rnd.choice(AGES) for _ in range(args.rows * 10)]
+    before, _ = timed(lambda: [age_to_days_reference(a) for a in corpus], args.repeat)
+    after, _ = timed(lambda: [pull_apply_links.age_to_days(a) for a in corpus], args.repeat)
+    report("age_to_days", len(corpus), before, after, "calls")
+    def cold():
+        pull_apply_links._AGE_MEMO.clear()
+        return [pull_apply_links.age_to_days(a) for a in corpus]
+    uncached, _ = timed(cold, args.repeat)
+    report("  (memo cleared per run)", len(corpus), before, uncached, "calls")
+
+def bench_cleanup(args):
+    """Per-row text cleanup: fused clean_md_cell vs. clean_md_text + strip_flag_emojis (twice for company/title)."""
+    lines = [ln for ln in synthetic_readme(args.rows).splitlines() if ln.startswith("| ") and "---" not in ln]
+    cells = [[c.strip() for c in ln.strip("|").split("|")] for ln in lines]
+    def reference():
+        out = []
+        for comp, role, loc, _, age in cells:
+            # parse pass, then main() used to strip company/title a second time
+            company = strip_flag_emojis_reference(strip_flag_emojis_reference(clean_md_text_reference(comp)))
+            title = strip_flag_emojis_reference(strip_flag_emojis_reference(clean_md_text_reference(role)))
+            out.append((company, title, clean_md_text_reference(loc), clean_md_text_reference(age)))
+        return out
+    def fused():
+        cell, text = pull_apply_links.clean_md_cell, pull_apply_links.clean_md_text
+        return [(cell(comp), cell(role), text(loc), text(age)) for comp, role, loc, _, age in cells]
+    before, ref = timed(reference, args.repeat)
+    after, got = timed(fused, args.repeat)
+    assert got == ref, "fused cleanup changed the cleaned text"
+    report("row text cleanup", len(cells), before, after)
+
+def bench_html(args):
+    """parse_html_table: lxml single tree walk vs. bs4 html.parser with per-row find_all/get_text."""
+    if pull_apply_links.etree is None:
+        print("html: skipped (lxml is not installed)")
+        return
+    fragment = synthetic_html_table(args.html_rows)
+    before, ref = timed(lambda: pull_apply_links.parse_html_table(fragment, "html.parser"), args.repeat)
+    after, got = timed(lambda: pull_apply_links.parse_html_table(fragment, "lxml"), args.repeat)
+    assert got == ref, "lxml backend changed parse_html_table output"
+    report("parse_html_table (lxml)", args.html_rows, before, after)
+
+BENCHMARKS = {
+    "html": bench_html,
+    "cleanup": bench_cleanup,
+    "age": bench_age,
+    "table": bench_table,
+    "neardup": bench_neardup,
+    "archives": bench_archives,
+    "bloom": bench_bloom,
+    "snapshot": bench_snapshot,
+    "urlnorm": bench_urlnorm,
+    "flags": bench_flags,
+    "parse": bench_parse,
+    "location": bench_location,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper hot paths on synthetic data.")
+    parser.add_argument("which", nargs="*", help=f"Benchmarks to run: {', '.join(sorted(BENCHMARKS))} (default: all).")
+    parser.add_argument("--rows", type=int, default=10000, help="Synthetic README rows (default: 10000).")
+    parser.add_argument("--html-rows", type=int, default=5000, help="Rows in the synthetic HTML table for the html benchmark (default: 5000).")
+    parser.add_argument("--archives", type=int, default=300, help="Synthetic archive CSVs for the archives benchmark (default: 300).")
+    parser.add_argument("--applied-rows", type=int, default=100000, help="Applied jobs in the store for the bloom benchmark (default: 100000).")
+    parser.add_argument("--workers", type=int, default=0, help="Processes for the archives benchmark (default: CPU count).")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N repetitions (default: 3).")
+    args = parser.parse_args()
+    unknown = [w for w in args.which if w not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in args.which or sorted(BENCHMARKS):
+        BENCHMARKS[name](args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+bloom.py
+
+Persisted Bloom filter over the applied canonical keys in the application
+store (applications.bloom next to applications.db). Most scraped jobs were
+never applied to, so a lookup usually ends at the filter; only a hit is
+confirmed against the exact index (the store or its snapshot).
+
+The filter remembers which store it was built from (its store_id) and the last
+store event it has seen, and catches up from the event log on load (only newly
+applied jobs are added), so loading it costs a file read plus O(new events).
+It is rebuilt from the store when it fills past its capacity or belongs to
+another (e.g. recreated) store.
+"""
+import hashlib
+import math
+import os
+import struct
+from typing import Container, Iterable, Optional
+
+from appstore import DB_FILE, ApplicationStore
+
+MAGIC = b"JOBBLOOM"
+VERSION = 2
+HEADER = struct.Struct("<8sIIQQQq16s")  # magic, version, k, m bits, count, capacity, last event id, store id
+ERROR_RATE = 0.01
+MIN_CAPACITY = 1024
+
+def bloom_path(db_path: str = DB_FILE) -> str:
+    """applications.db -> applications.bloom"""
+    return os.path.splitext(db_path)[0] + ".bloom"
+
+class BloomFilter:
+    """k bit positions per key, each a 32-bit slice of one blake2b digest; no false negatives."""
+    def __init__(self, capacity: int, error_rate: float = ERROR_RATE):
+        self.capacity = max(capacity, 1)
+        self.m = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.k = min(16, max(1, round(self.m / self.capacity * math.log(2))))   # 16 slices fill a 64-byte digest
+        self._slices = struct.Struct(f"<{self.k}I")
+        self.bits = bytearray((self.m + 7) // 8)
+        self.count = 0
+        self.last_event = 0
+        self.store_id = ""
+
+    def _positions(self, key: str):
+        m = self.m
+        return [x % m for x in self._slices.unpack(hashlib.blake2b(key.encode("utf-8"), digest_size=4 * self.k).digest())]
+
+    def add(self, key: str) -> None:
+        bits = self.bits
+        for p in self._positions(key):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        for p in self._positions(key):
+            if not bits[p >> 3] & (1 << (p & 7)):
+                return False
+        return True
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.k, self.m, self.count, self.capacity, self.last_event,
+                                bytes.fromhex(self.store_id)))
+            f.write(self.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, k, m, count, capacity, last_event, store_id = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION or len(data) != HEADER.size + (m + 7) // 8:
+            raise ValueError(f"{path}: not a version {VERSION} Bloom filter")
+        bf = cls.__new__(cls)
+        bf.k, bf.m, bf.count, bf.capacity, bf.last_event = k, m, count, capacity, last_event
+        bf.store_id = store_id.hex()
+        bf._slices = struct.Struct(f"<{k}I")
+        bf.bits = bytearray(data[HEADER.size:])
+        return bf
+
+def applied_bloom(store: ApplicationStore, path: Optional[str] = None, error_rate: float = ERROR_RATE) -> BloomFilter:
+    """The store's Bloom filter, brought up to date (and saved) if the store has new applied jobs."""
+    path = path or bloom_path(store.path)
+    last_event = store.db.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+    bf = None
+    if os.path.exists(path):
+        try:
+            bf = BloomFilter.load(path)
+        except (OSError, ValueError, struct.error):
+            bf = None
+    if bf is not None and (bf.store_id != store.store_id or bf.last_event > last_event):
+        bf = None   # built from another store (e.g. applications.db was deleted and recreated)
+    if bf is not None and bf.last_event < last_event:
+        # old_status NULL: the job was first marked applied by that event
+        new = [k for (k,) in store.db.execute(
+            "SELECT key FROM events WHERE id > ? AND old_status IS NULL", (bf.last_event,))]
+        if bf.count + len(new) > bf.capacity:
+            bf = None
+        else:
+            bf.update(new)
+            bf.last_event = last_event
+            bf.save(path)
+    if bf is None:
+        applied = store.db.execute("SELECT COUNT(*) FROM jobs WHERE applied").fetchone()[0]
+        # room to grow, so most runs only append
+        bf = BloomFilter(max(MIN_CAPACITY, 2 * applied), error_rate)
+        bf.update(k for (k,) in store.db.execute("SELECT key FROM jobs WHERE applied"))
+        bf.last_event = last_event
+        bf.store_id = store.store_id
+        bf.save(path)
+    return bf
+
+class BloomGuard:
+    """`key in guard`: the Bloom filter first, the exact index only when the filter says maybe."""
+    def __init__(self, bloom: BloomFilter, exact: Container[str]):
+        self.bloom = bloom
+        self.exact = exact
+        self.lookups = 0
+        self.maybe = 0          # filter hits passed on to the exact index
+        self.confirmed = 0
+
+    def __contains__(self, key: str) -> bool:
+        self.lookups += 1
+        if key not in self.bloom:
+            return False
+        self.maybe += 1
+        found = key in self.exact
+        self.confirmed += found
+        return found
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+    def summary(self) -> str:
+        return (f"{self.lookups} lookup(s), {self.maybe} passed the Bloom filter, "
+                f"{self.maybe - self.confirmed} false positive(s)")
@@ -2,20 +2,29 @@
 """
 detailed_analysis.py
 
-Loads current applying CSV + all past CSVs, dedupes by normalized apply_url,
-detects applied rows and statuses, prints a formatted terminal report and
+Imports the current applying CSV + all past CSVs into the application store
+(applications.db; only files it hasn't seen), reads applied jobs and their
+latest statuses from its mmapped snapshot (applications.snap, rebuilt only
+when an export or the store changed), prints a formatted terminal report and
 writes application_analysis.csv.
 
 Run:
     python detailed_analysis.py
+    python detailed_analysis.py --workers 4   # parse new archives on 4 processes
+    python detailed_analysis.py --no-db       # read the CSVs directly (first-seen row wins)
 """
+import argparse
 import csv
 import os
 import sys
-import urllib.parse
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Tuple
 
+from appstore import DB_FILE, export_paths
+from snapshot import Snapshot, open_snapshot
+from urlnorm import KEY_COLUMN, canonical_key
+
 CURRENT_APPLICATIONS_FILE = "new_grad_swe_apply_links_applying.csv"
 PAST_DATA_FOLDER = "past_applied_data"
 OUTPUT_CSV = "application_analysis.csv"
@@ -66,59 +75,39 @@ def detect_url_key(fieldnames: List[str]) -> str:
             return orig
     return fieldnames[0] if fieldnames else ""
 
-def strip_tracking(u: str) -> str:
-    if not u:
-        return ""
-    try:
-        p = urllib.parse.urlparse(u)
-    except Exception:
-        return u.strip()
-    if not p.query:
-        return urllib.parse.urlunparse(p._replace(query=""))
-    keep = []
-    for k, v in urllib.parse.parse_qsl(p.query, keep_blank_values=True):
-        lk = (k or "").lower(); lv = (v or "").lower()
-        if lk.startswith("utm_") or "simplify" in lk or "simplify" in lv:
+# --- load and dedupe ---
+def load_file_applications(path: str) -> Dict[str, Dict[str, str]]:
+    """First-seen row per normalized URL for a single file, keys lowercased."""
+    out: Dict[str, Dict[str, str]] = {}
+    rows = load_csv_rows(path)
+    if not rows:
+        return out
+    url_key = detect_url_key(list(rows[0].keys()))
+    if not url_key:
+        return out
+    for r in rows:
+        raw = r.get(url_key, "").strip()
+        if not raw:
             continue
-        keep.append((k, v))
-    q = urllib.parse.urlencode(keep)
-    out = urllib.parse.urlunparse(p._replace(query=q))
-    if not q:
-        out = f"{p.scheme}://{p.netloc}{p.path}"
+        # reuse the key pull_apply_links stored, if the export kept the column
+        n = r.get(KEY_COLUMN) or canonical_key(raw)
+        if n not in out:
+            out[n] = {k.lower().strip(): v for k, v in r.items()}
     return out
 
-def norm_url(u: str) -> str:
-    u = (u or "").strip()
-    try:
-        p = urllib.parse.urlparse(u)
-        scheme = (p.scheme or "https").lower()
-        netloc = (p.netloc or "").lower()
-        path = (p.path or "").rstrip("/")
-        query = p.query or ""
-        return urllib.parse.urlunparse((scheme, netloc, path, "", query, ""))
-    except Exception:
-        return u.rstrip("/").lower()
-
-# --- load and dedupe ---
-def load_all_applications(current_file: str, past_folder: str) -> Dict[str, Dict[str, str]]:
+def load_all_applications(current_file: str, past_folder: str, workers: int = 1) -> Dict[str, Dict[str, str]]:
     files = gather_files(current_file, past_folder)
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            per_file = list(ex.map(load_file_applications, files, chunksize=max(1, len(files) // (workers * 4))))
+    else:
+        per_file = [load_file_applications(p) for p in files]
     combined: Dict[str, Dict[str, str]] = {}
-    for p in files:
-        rows = load_csv_rows(p)
-        if not rows:
-            continue
-        url_key = detect_url_key(list(rows[0].keys()))
-        if not url_key:
-            continue
-        for r in rows:
-            raw = r.get(url_key, "").strip()
-            if not raw:
-                continue
-            cleaned = strip_tracking(raw)
-            n = norm_url(cleaned)
-            # prefer first-seen (current_file should be first in gather_files)
+    # merge in gather_files order: prefer first-seen (current_file should be first)
+    for rows in per_file:
+        for n, r in rows.items():
             if n not in combined:
-                combined[n] = {k.lower().strip(): v for k, v in r.items()}
+                combined[n] = r
     return combined
 
 # --- analysis ---
@@ -150,7 +139,18 @@ def analyze(combined: Dict[str, Dict[str, str]]) -> Tuple[Dict, List[Dict[str,st
             company = (r.get("company") or "").strip() or "Unknown"
             company_counts[company] += 1
 
-    total_applied = len(applied_rows)
+    return summarize(total_unique, dict(status_counts), dict(company_counts.most_common(30))), applied_rows
+
+def analyze_store(store: Snapshot, sample: int = 10) -> Tuple[Dict, List[Dict[str,str]]]:
+    """
+    Same report as analyze(), from the store's funnel counts (latest status per job,
+    kept up to date from its event log); only `sample` applied rows are read.
+    Takes an ApplicationStore or its Snapshot.
+    """
+    return summarize(store.job_count(), store.status_counts(), dict(store.company_counts(30))), store.applied_jobs(sample)
+
+def summarize(total_unique: int, status_counts: Dict[str, int], company_counts: Dict[str, int]) -> Dict:
+    total_applied = sum(status_counts.values())
     interviews = sum(v for k, v in status_counts.items() if "interview" in k or "offer" in k or "hired" in k or "accepted" in k)
     offers = sum(v for k, v in status_counts.items() if "offer" in k or "accepted" in k or "hired" in k)
     ghosted = total_applied - interviews
@@ -168,11 +168,10 @@ def analyze(combined: Dict[str, Dict[str, str]]) -> Tuple[Dict, List[Dict[str,st
         "interview_rate": interview_rate,
         "offer_rate": offer_rate,
         "ghosted_rate": ghosted_rate,
-        "status_counts": dict(status_counts),
-        "company_counts": dict(company_counts.most_common(30)),
+        "status_counts": status_counts,
+        "company_counts": company_counts,
     }
-
-    return metrics, applied_rows
+    return metrics
 
 # --- output ---
 def write_analysis_csv(metrics: Dict, out_file: str):
@@ -222,8 +221,22 @@ def pretty_print(metrics: Dict, sample_applied: List[Dict[str,str]]):
 
 # --- main ---
 def main():
-    combined = load_all_applications(CURRENT_APPLICATIONS_FILE, PAST_DATA_FOLDER)
-    metrics, applied_rows = analyze(combined)
+    parser = argparse.ArgumentParser(description="Analyze current + archived application CSVs.")
+    parser.add_argument("--workers", type=int, default=1, help="Parse archive CSVs on N processes (default: 1).")
+    parser.add_argument("--db", default=DB_FILE, help=f"Application store (default: {DB_FILE}).")
+    parser.add_argument("--no-db", action="store_true", help="Read every CSV directly instead of using the store.")
+    args = parser.parse_args()
+
+    if args.no_db:
+        combined = load_all_applications(CURRENT_APPLICATIONS_FILE, PAST_DATA_FOLDER, args.workers)
+        metrics, applied_rows = analyze(combined)
+    else:
+        snap, rebuilt = open_snapshot(export_paths(CURRENT_APPLICATIONS_FILE, PAST_DATA_FOLDER), args.db, workers=args.workers)
+        try:
+            print("Snapshot " + ("rebuilt after importing new exports." if rebuilt else "up to date."))
+            metrics, applied_rows = analyze_store(snap)
+        finally:
+            snap.close()
     write_analysis_csv(metrics, OUTPUT_CSV)
     pretty_print(metrics, applied_rows)
 
@@ -0,0 +1,119 @@
+"""
+fixtures.py
+
+Reference implementations and data shared by the tests and bench.py: the fast
+paths are checked against these.
+"""
+import random
+import re
+
+import pull_apply_links
+
+# ---------- Synthetic data ----------
+COMPANIES = ["Acme", "Globex 🔥", "Initech", "Umbrella", "[Hooli](https://hooli.com)",
+             "Stark 🛂", "Wayne Enterprises", "Cyberdyne", "Soylent", "Tyrell"]
+TITLES = ["Software Engineer", "SWE New Grad 🇺🇸", "Backend Engineer - Master's", "Frontend Developer",
+          "Data Engineer 🎓", "SDE I 🔒", "Platform Engineer", "Software Engineer I - No Sponsorship"]
+LOCATIONS = ["NYC", "Remote in USA", "San Francisco, CA", "Toronto, Canada", "London, UK",
+             "Austin, TX", "Remote", "Seattle, WA</br>Boston, MA", "Berlin", "New York, NY",
+             "United States", "Mountain View, CA", "Vancouver, BC, Canada", "Chicago, IL"]
+ATS_URLS = [
+    "https://boards.greenhouse.io/acme/jobs/{i}?utm_source=Simplify&ref=simplify",
+    "https://jobs.lever.co/globex/{i}/apply?utm_campaign=simplify",
+    "https://acme.wd5.myworkdayjobs.com/en-US/Careers/job/New-York/SWE_{i}/",
+    "https://careers.initech.com/job/{i}?gh_jid={i}",
+    "https://jobs.ashbyhq.com/umbrella/{i}",
+]
+AGES = ["0d", "1d", "3d", "5d", "8d", "2w", "1mo", "12h", "1 day", "3 days", "1 year"]
+
+def synthetic_readme(n_rows: int, seed: int = 1) -> str:
+    rnd = random.Random(seed)
+    out = ["# New Grad Positions", "",
+           "## Software Engineering New Grad Roles", "",
+           "| Company | Role | Location | Application | Age |",
+           "| ------- | ---- | -------- | ----------- | --- |"]
+    for i in range(n_rows):
+        company = "↳" if rnd.random() < 0.2 else rnd.choice(COMPANIES)
+        url = rnd.choice(ATS_URLS).format(i=i)
+        if rnd.random() < 0.1:
+            app = "🔒"
+        else:
+            app = (f'<a href="{url}"><img src="https://i.imgur.com/u1vyNQ9.png" width="118" alt="Apply"></a> '
+                   f'<a href="https://simplify.jobs/p/{i}"><img src="https://i.imgur.com/aVnQdox.png" width="84" alt="Simplify"></a>')
+        out.append(f"| {company} | {rnd.choice(TITLES)} | {rnd.choice(LOCATIONS)} | {app} | {rnd.choice(AGES)} |")
+    out += ["", "### Inactive roles", "",
+            "| Company | Role | Location | Application | Age |",
+            "| ------- | ---- | -------- | ----------- | --- |",
+            '| Oldco | SWE | NYC | <a href="https://jobs.lever.co/oldco/1">Apply</a> | 90d |',
+            "", "## Data Science, AI & Machine Learning New Grad Roles", ""]
+    return "\n".join(out) + "\n"
+
+def synthetic_html_table(n_rows: int, seed: int = 7) -> str:
+    """The same jobs as an HTML <table>, with the markup quirks the upstream HTML tables have."""
+    rnd = random.Random(seed)
+    out = ["<table>", "<thead>", "<tr><th>Company</th><th>Role</th><th>Location</th><th>Application</th><th>Age</th></tr>",
+           "</thead>", "<tbody>"]
+    for i in range(n_rows):
+        company = "↳" if rnd.random() < 0.2 else f"<strong><a href=\"https://simplify.jobs/c/{i % 97}\">{rnd.choice(COMPANIES)}</a></strong>"
+        role = rnd.choice(TITLES) + (' <img src="lock.png" alt="🔒">' if rnd.random() < 0.05 else "")
+        location = rnd.choice(LOCATIONS) if rnd.random() < 0.8 else "Austin, TX</br>Remote &amp; Hybrid"
+        url = rnd.choice(ATS_URLS).format(i=i).replace("&", "&amp;")
+        if rnd.random() < 0.1:
+            app = "🔒"
+        else:
+            app = (f'<div align="center"><a href="{url}"><img src="https://i.imgur.com/u1vyNQ9.png" width="118" alt="Apply"></a> '
+                   f'<!-- simplify --><a href="https://simplify.jobs/p/{i}"><img src="https://i.imgur.com/aVnQdox.png" width="84" alt="Simplify"></a></div>')
+        out.append(f"<tr>\n<td>{company}</td>\n<td>{role}</td>\n<td>{location}</td>\n<td>{app}</td>\n<td>{rnd.choice(AGES)}</td>\n</tr>")
+    out += ["</tbody>", "</table>"]
+    return "\n".join(out) + "\n"
+
+# Location strings in the shapes the upstream README uses
+LOCATION_CORPUS = [
+    "NYC", "SF", "Remote in USA", "Remote", "Remote in Canada", "Remote in UK", "New York, NY",
+    "San Francisco, CA", "Mountain View, CA", "Seattle, WA", "Austin, TX", "Boston, MA",
+    "Chicago, IL", "Atlanta, GA", "Denver, CO", "Washington, DC", "Arlington, VA", "Houston, TX",
+    "Milwaukee, WI", "Raleigh, NC", "Salt Lake City, UT", "Pittsburgh, PA", "Columbus, OH",
+    "Toronto, ON, Canada", "Vancouver, BC, Canada", "Montreal, QC, Canada", "London, UK",
+    "Cambridge, United Kingdom", "Dublin, Ireland", "Bangalore, India", "Berlin, Germany",
+    "Tel Aviv, Israel", "Singapore", "United States", "USA", "U.S.", "US", "Multiple Locations",
+    "Seattle, WA</br>Boston, MA", "New York, NY</br>Toronto, ON, Canada", "Hybrid - Sunnyvale, CA",
+    "Palo Alto, CA; Remote", "Redmond, Washington", "Detroit, Michigan", "Canada", "Ottawa",
+    "<details><summary>**4 locations**</summary>Austin, TX</br>Dallas, TX</br>Remote</details>",
+    "", "Remote, Anywhere", "Lehi, UT", "McLean, VA", "Annapolis Junction, MD", "Honolulu, HI",
+]
+
+# ---------- Reference implementations ----------
+def is_us_location_reference(location: str) -> bool:
+    """The original per-call implementation."""
+    loc_upper = (location or "").upper()
+    if any(keyword.upper() in loc_upper for keyword in pull_apply_links.NON_US_KEYWORDS):
+        return False
+    if any(keyword.upper() in loc_upper for keyword in pull_apply_links.US_KEYWORDS):
+        return True
+    if any(re.search(r'\b' + re.escape(code) + r'\b', loc_upper) for code in pull_apply_links.US_STATE_CODES):
+        return True
+    if "REMOTE" in loc_upper and not any(k.upper() in loc_upper for k in pull_apply_links.NON_US_KEYWORDS):
+        return True
+    return False
+
+def detect_flags_reference(text: str, phrases=pull_apply_links.FLAG_PHRASES) -> dict:
+    """One substring scan per phrase, as detect_flags() used to do."""
+    out = {k: False for k in pull_apply_links.FLAG_EMOJIS.values()}
+    for e, k in pull_apply_links.FLAG_EMOJIS.items():
+        if e in text:
+            out[k] = True
+    low = (text or "").lower()
+    for flag, words in phrases.items():
+        if any(w.lower() in low for w in words):
+            out[flag] = True
+    return out
+
+def clean_md_text_reference(md):
+    """clean_md_text / strip_flag_emojis as two regex subs and a replace loop, for comparison."""
+    md = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", md or "")
+    return re.sub(r"\s+", " ", md).strip()
+
+def strip_flag_emojis_reference(s):
+    for e in pull_apply_links.FLAG_EMOJIS:
+        s = s.replace(e, "")
+    return re.sub(r"\s+", " ", s).strip()
@@ -17,6 +17,12 @@ function ensureAppliedColumn() {
 
   // Set all cells in Applied column to checkbox
   sheet.getRange(2, col, sheet.getLastRow() - 1).insertCheckboxes();
+
+  // Hide the "_key" column (normalized URL written by pull_apply_links.py)
+  const keyCol = headers.indexOf("_key") + 1;
+  if (keyCol > 0) {
+    sheet.hideColumns(keyCol);
+  }
   SpreadsheetApp.getUi().alert('"Applied" column ready with checkboxes!');
 }
 
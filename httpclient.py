@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+httpclient.py
+
+One pooled requests.Session for every outbound request: keep-alive connections,
+gzip, retries with exponential backoff on 429/5xx and connection errors, and a
+total deadline per request (retries and body download included). Each client
+keeps HttpTimings (DNS / connect / wait / transfer) for the run summary.
+"""
+import codecs
+import socket
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+CHUNK_SIZE = 1 << 16
+
+class DeadlineExceeded(requests.Timeout):
+    """The request (with its retries) did not finish within the client's deadline."""
+
+class HttpTimings:
+    """
+    Seconds spent per phase, summed over all requests of one client (thread-safe).
+    dns/connect only accrue for new connections; wait is request sent -> response
+    headers, minus any dns/connect on the way; transfer is reading the body.
+    """
+    PHASES = ("dns", "connect", "wait", "transfer")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()     # dns+connect spent by this thread's current request
+        self.seconds: Dict[str, float] = dict.fromkeys(self.PHASES, 0.0)
+        self.requests = 0       # attempts sent, retries included
+        self.retries = 0
+        self.connections = 0    # new TCP (+TLS) connections; the rest reused a pooled one
+        self.bytes = 0          # response bytes as received (before gzip decoding)
+
+    def add(self, **phases: float) -> None:
+        with self._lock:
+            for name, secs in phases.items():
+                self.seconds[name] += secs
+
+    def connected(self, dns: float, connect: float) -> None:
+        self.add(dns=dns, connect=connect)
+        self.count(connections=1)
+        self._local.setup = getattr(self._local, "setup", 0.0) + dns + connect
+
+    def take_setup(self) -> float:
+        setup, self._local.setup = getattr(self._local, "setup", 0.0), 0.0
+        return setup
+
+    def count(self, requests: int = 0, retries: int = 0, connections: int = 0, nbytes: int = 0) -> None:
+        with self._lock:
+            self.requests += requests
+            self.retries += retries
+            self.connections += connections
+            self.bytes += nbytes
+
+    def summary(self) -> str:
+        s = self.seconds
+        return (f"{self.requests} request(s), {self.retries} retried, {self.connections} new connection(s), "
+                f"{self.bytes / 1024:.0f} KiB; dns {s['dns']:.2f}s, connect {s['connect']:.2f}s, "
+                f"wait {s['wait']:.2f}s, transfer {s['transfer']:.2f}s")
+
+def _timed_connection(base: type, timings: HttpTimings) -> type:
+    """A urllib3 connection class that reports DNS and connect (TCP + TLS) time to timings."""
+    def _new_conn(self):
+        # resolve here so the lookup can be timed, then let urllib3 connect to each address in turn
+        host = self._dns_host
+        t0 = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        self._dns_seconds = time.perf_counter() - t0
+        err = None
+        try:
+            for *_, sockaddr in infos:
+                self._dns_host = sockaddr[0]
+                try:
+                    return base._new_conn(self)
+                except (OSError, NewConnectionError, ConnectTimeoutError) as e:
+                    # urllib3 wraps refused/timed-out connects; try the next address, raise the last failure
+                    err = e
+            raise err
+        finally:
+            self._dns_host = host
+
+    def connect(self):
+        self._dns_seconds = 0.0
+        t0 = time.perf_counter()
+        base.connect(self)
+        elapsed = time.perf_counter() - t0
+        timings.connected(self._dns_seconds, elapsed - self._dns_seconds)
+
+    return type("Timed" + base.__name__, (base,), {"_new_conn": _new_conn, "connect": connect})
+
+class _TimedAdapter(HTTPAdapter):
+    def __init__(self, timings: HttpTimings, **kwargs):
+        self.timings = timings
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("TimedHTTPConnectionPool", (HTTPConnectionPool,),
+                         {"ConnectionCls": _timed_connection(HTTPConnection, self.timings)}),
+            "https": type("TimedHTTPSConnectionPool", (HTTPSConnectionPool,),
+                          {"ConnectionCls": _timed_connection(HTTPSConnection, self.timings)}),
+        }
+
+class HttpClient:
+    """
+    Shared session with retry/backoff and a total deadline.
+    retries: extra attempts after a 429/5xx or connection error.
+    backoff: first retry delay in seconds, doubled per retry (capped at max_backoff);
+             a Retry-After header is honoured when it asks for longer.
+    timeout: connect/read timeout per attempt; deadline: total seconds per request.
+    pool_size: idle keep-alive connections kept per host; pool_hosts: hosts kept pooled.
+    """
+    def __init__(self, retries: int = 3, backoff: float = 0.5, timeout: float = 30.0,
+                 deadline: Optional[float] = 120.0, pool_size: int = 10, max_backoff: float = 30.0,
+                 pool_hosts: Optional[int] = None):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.deadline = deadline
+        self.timings = HttpTimings()
+        self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        adapter = _TimedAdapter(self.timings, pool_connections=pool_hosts or pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _remaining(self, deadline: Optional[float], url: str) -> float:
+        if deadline is None:
+            return self.timeout
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise DeadlineExceeded(f"{url}: no response within the {self.deadline}s deadline")
+        return min(self.timeout, left)
+
+    def retry_delay(self, attempt: int, r: Optional[requests.Response]) -> float:
+        delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+        retry_after = r.headers.get("Retry-After", "") if r is not None else ""
+        if retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.max_backoff))
+        return delay
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                deadline: Optional[float] = None, allow_redirects: bool = True) -> requests.Response:
+        """
+        Send with retries and return the response with its body still unread (stream=True).
+        A retryable status that outlasts the retries is returned as is, for raise_for_status().
+        """
+        if deadline is None and self.deadline is not None:
+            deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            timeout = self._remaining(deadline, url)
+            self.timings.take_setup()
+            t0 = time.perf_counter()
+            self.timings.count(requests=1)
+            try:
+                r = self.session.request(method, url, headers=headers, timeout=timeout, stream=True,
+                                         allow_redirects=allow_redirects)
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                r, error = None, e
+            self.timings.add(wait=time.perf_counter() - t0 - self.timings.take_setup())
+            if r is not None and r.status_code not in RETRY_STATUSES:
+                return r
+            delay = self.retry_delay(attempt, r)
+            out_of_time = deadline is not None and time.monotonic() + delay >= deadline
+            if attempt >= self.retries or out_of_time:
+                if r is not None:
+                    return r
+                raise error
+            if r is not None:
+                r.content  # drain the (small) error body so the connection goes back to the pool
+                r.close()
+            attempt += 1
+            self.timings.count(retries=1)
+            time.sleep(delay)
+
+    def _chunks(self, r: requests.Response, url: str, deadline: Optional[float]) -> Iterator[bytes]:
+        # only time spent reading counts as transfer, not the caller's work between chunks
+        reading = 0.0
+        it = r.iter_content(CHUNK_SIZE)
+        try:
+            while True:
+                t0 = time.perf_counter()
+                chunk = next(it, None)
+                reading += time.perf_counter() - t0
+                if chunk is None:
+                    return
+                self._remaining(deadline, url)
+                yield chunk
+        finally:
+            self.timings.add(transfer=reading)
+            self.timings.count(nbytes=r.raw.tell() if hasattr(r.raw, "tell") else 0)
+            r.close()
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """GET with retries; the body is read before returning, all within the deadline."""
+        deadline = time.monotonic() + self.deadline if self.deadline is not None else None
+        r = self.request("GET", url, headers, deadline)
+        r._content = b"".join(self._chunks(r, url, deadline))
+        return r
+
+    def iter_lines(self, url: str) -> Iterator[str]:
+        """
+        Stream a text document line by line. Retries cover the request up to the
+        response headers; a failure mid-body is raised, not retried.
+        """
+        deadline = time.monotonic() + self.deadline if self.deadline is not None else None
+        r = self.request("GET", url, deadline=deadline)
+        r.raise_for_status()
+        r.encoding = r.encoding or "utf-8"
+        decoder = codecs.getincrementaldecoder(r.encoding)(errors="replace")
+        pending = ""
+        for chunk in self._chunks(r, url, deadline):
+            lines = (pending + decoder.decode(chunk)).splitlines(keepends=True)
+            # the last piece may be a partial line (or a \r whose \n is in the next chunk)
+            pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+            for ln in lines:
+                yield ln.rstrip("\r\n")
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield pending
+
+_default: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+def default_client() -> HttpClient:
+    """The process-wide client used when a caller doesn't pass one."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HttpClient()
+        return _default
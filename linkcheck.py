@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+linkcheck.py
+
+Liveness check for apply links. Many direct ATS links in the README point at
+postings that were already taken down; check_links() asks each host whether
+the posting still exists (HEAD, falling back to GET) so pull_apply_links can
+mark dead ones closed.
+
+Every request (fallback GETs and retries included) goes through a
+HostScheduler, which caps requests in flight and paces each host with a token
+bucket; verdicts are kept in a LinkCache for `ttl` seconds so re-runs only
+check new links.
+"""
+import asyncio
+import functools
+import json
+import os
+import time
+import urllib.parse
+from typing import Dict, Iterable, NamedTuple, Optional
+
+import requests
+
+from httpclient import RETRY_STATUSES
+from scheduler import HostScheduler
+
+ALIVE, DEAD, UNKNOWN = "alive", "dead", "unknown"
+# statuses that mean the posting is gone; anything else that isn't 2xx/3xx is UNKNOWN
+DEAD_STATUSES = frozenset({404, 410})
+# closed postings that redirect to a generic page instead of returning 404
+DEAD_REDIRECT_MARKERS = (
+    "error=true",           # greenhouse: boards.greenhouse.io/<co>?error=true
+    "/jobs/not-found",
+    "job-not-found",
+)
+HEAD_UNSUPPORTED = frozenset({403, 405, 501})
+MAX_REDIRECTS = 5
+
+class LinkStatus(NamedTuple):
+    state: str              # ALIVE, DEAD or UNKNOWN
+    status: Optional[int]   # final HTTP status, None on a network error
+    checked_at: float
+
+class LinkCache:
+    """
+    Verdicts from earlier runs, stored as JSON. Entries older than ttl seconds are
+    ignored; UNKNOWN results are never stored, so they are retried next run.
+    """
+    def __init__(self, path: Optional[str] = None, ttl: float = 6 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self.entries: Dict[str, LinkStatus] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = {url: LinkStatus(*v) for url, v in json.load(f).items()}
+            except (OSError, ValueError, TypeError):
+                self.entries = {}
+
+    def get(self, url: str) -> Optional[LinkStatus]:
+        st = self.entries.get(url)
+        if st is None or time.time() - st.checked_at > self.ttl:
+            return None
+        return st
+
+    def put(self, url: str, st: LinkStatus) -> None:
+        if st.state != UNKNOWN:
+            self.entries[url] = st
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        now = time.time()
+        live = {url: list(st) for url, st in self.entries.items() if now - st.checked_at <= self.ttl}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(live, f)
+        os.replace(tmp, self.path)
+
+def classify(r: requests.Response) -> str:
+    if r.status_code in DEAD_STATUSES:
+        return DEAD
+    if r.status_code >= 400 or r.is_redirect:
+        return UNKNOWN
+    final = (r.url or "").lower()
+    if any(marker in final for marker in DEAD_REDIRECT_MARKERS):
+        return DEAD
+    return ALIVE
+
+async def probe(scheduler: HostScheduler, url: str, retries: int = 2) -> LinkStatus:
+    """
+    HEAD, or GET when the host refuses HEAD (a GET body is never read). A 429 backs off
+    the whole host; other retryable failures only delay this link's next attempt.
+    Redirects are followed here, so each hop is paced by its own host's bucket.
+    """
+    client = scheduler.client
+    method = "HEAD"
+    attempt = 0
+    redirects = 0
+    while True:
+        try:
+            r = await scheduler.run(url, functools.partial(client.request, method, url, allow_redirects=False))
+        except requests.RequestException:
+            if attempt >= retries:
+                return LinkStatus(UNKNOWN, None, time.time())
+            await asyncio.sleep(client.retry_delay(attempt, None))
+            attempt += 1
+            continue
+        if method == "HEAD":
+            r.content  # empty; reading it hands the connection back to the pool instead of closing it
+        r.close()
+        if method == "HEAD" and r.status_code in HEAD_UNSUPPORTED:
+            method = "GET"
+            continue
+        if r.is_redirect and redirects < MAX_REDIRECTS:
+            url = urllib.parse.urljoin(url, r.headers["Location"])
+            redirects += 1
+            continue
+        if r.status_code in RETRY_STATUSES and attempt < retries:
+            delay = client.retry_delay(attempt, r)
+            if r.status_code == 429:
+                scheduler.backoff(url, delay)
+            else:
+                await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        return LinkStatus(classify(r), r.status_code, time.time())
+
+async def _check_all(urls: Iterable[str], scheduler: HostScheduler, retries: int) -> Dict[str, LinkStatus]:
+    urls = list(urls)
+    verdicts = await asyncio.gather(*(probe(scheduler, u, retries) for u in urls))
+    return dict(zip(urls, verdicts))
+
+def check_links(urls: Iterable[str], cache: Optional[LinkCache] = None,
+                scheduler: Optional[HostScheduler] = None, retries: int = 2) -> Dict[str, LinkStatus]:
+    """
+    Liveness of each distinct URL. Cached verdicts are reused; the rest are probed
+    through scheduler (a default HostScheduler if none is given).
+    """
+    cache = cache if cache is not None else LinkCache()
+    results: Dict[str, LinkStatus] = {}
+    todo = []
+    for url in dict.fromkeys(urls):
+        st = cache.get(url)
+        if st is None:
+            todo.append(url)
+        else:
+            results[url] = st
+    if todo:
+        own = scheduler is None
+        scheduler = scheduler or HostScheduler()
+        try:
+            fresh = asyncio.run(_check_all(todo, scheduler, retries))
+        finally:
+            if own:
+                scheduler.close()
+        for url, st in fresh.items():
+            cache.put(url, st)
+        results.update(fresh)
+    return results
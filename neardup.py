@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+neardup.py
+
+Near-duplicate detection for job rows that share no URL: the same posting
+mirrored on the company's careers site and on its ATS, or re-listed with a
+slightly different title ("Software Engineer I" / "Software Engineer 1").
+
+Each row becomes a set of shingles (title words, title word pairs, location
+words) and a MinHash signature: for each of K hash functions (a*x + b mod p
+over the shingle's crc32), the smallest value in the set. Signatures are split
+into bands; rows of the same company that agree on a whole band land in the
+same bucket and become candidates, and candidates are confirmed by the exact
+Jaccard similarity of their shingle sets. Rows with identical shingle sets are
+collapsed first, and a shingle's K hashes are computed once per index.
+"""
+import random
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, FrozenSet, Hashable, Iterator, List, Tuple
+
+BANDS = 8
+ROWS_PER_BAND = 4
+THRESHOLD = 0.8         # Jaccard similarity at which two rows are the same job
+_PRIME = (1 << 61) - 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({"and", "the", "of", "for", "in", "at", "to", "a", "an"})
+# spellings that differ between listings of the same role
+_SYNONYMS = {"i": "1", "ii": "2", "iii": "3", "swe": "software engineer", "sde": "software engineer", "sr": "senior",
+             "grad": "graduate", "ny": "new york", "nyc": "new york", "sf": "san francisco",
+             "usa": "us"}
+
+def tokens(text: str) -> List[str]:
+    out = []
+    for t in _TOKEN_RE.findall((text or "").lower()):
+        if t in _STOPWORDS:
+            continue
+        out.extend(_SYNONYMS.get(t, t).split())
+    return out
+
+@lru_cache(maxsize=1 << 16)
+def shingles(title: str, location: str) -> FrozenSet[str]:
+    words = tokens(title)
+    return frozenset(words + [f"{a} {b}" for a, b in zip(words, words[1:])] + ["@" + w for w in tokens(location)])
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def similar(a: FrozenSet[str], b: FrozenSet[str], threshold: float = THRESHOLD) -> bool:
+    """jaccard(a, b) >= threshold, skipping the set work when the sizes alone rule it out."""
+    la, lb = len(a), len(b)
+    if min(la, lb) < threshold * max(la, lb):
+        return False
+    inter = len(a & b)
+    return inter >= threshold * (la + lb - inter)
+
+class NearDupIndex:
+    """
+    add() rows as (group, title, location) -- group is usually the normalized
+    company; rows are only ever matched within a group -- then clusters() yields
+    the sets of row ids that are near-duplicates of each other.
+    """
+    def __init__(self, bands: int = BANDS, rows_per_band: int = ROWS_PER_BAND, threshold: float = THRESHOLD,
+                 seed: int = 1):
+        self.bands = bands
+        self.rows_per_band = rows_per_band
+        self.bins = bands * rows_per_band
+        self.threshold = threshold
+        rnd = random.Random(seed)
+        self._coeffs = [(rnd.randrange(1, _PRIME), rnd.randrange(_PRIME)) for _ in range(self.bins)]
+        self._hash: Dict[str, List[int]] = {}   # shingle -> its K hashes (shingles repeat across rows)
+        self._bands: Dict[FrozenSet[str], List[int]] = {}      # shingles -> band hashes (so do whole sets)
+        # rows with identical (group, shingles) share one representative
+        self._reps: Dict[Tuple[Hashable, FrozenSet[str]], int] = {}
+        self._members: List[List[int]] = []     # representative -> row ids
+        self._rep_shingles: List[FrozenSet[str]] = []
+        self._buckets: Dict[Tuple[Hashable, int], List[int]] = {}
+
+    def _hashes(self, shingle: str) -> List[int]:
+        h = self._hash.get(shingle)
+        if h is None:
+            x = zlib.crc32(shingle.encode("utf-8"))
+            h = self._hash[shingle] = [(a * x + b) % _PRIME for a, b in self._coeffs]
+        return h
+
+    def signature(self, sh: FrozenSet[str]) -> List[int]:
+        if not sh:
+            return [0] * self.bins
+        return list(map(min, zip(*map(self._hashes, sh))))
+
+    def add(self, row_id: int, group: Hashable, title: str, location: str) -> None:
+        sh = shingles(title, location)
+        rep = self._reps.get((group, sh))
+        if rep is not None:
+            self._members[rep].append(row_id)
+            return
+        rep = self._reps[(group, sh)] = len(self._members)
+        self._members.append([row_id])
+        self._rep_shingles.append(sh)
+        bands = self._bands.get(sh)
+        if bands is None:
+            sig, r = self.signature(sh), self.rows_per_band
+            bands = self._bands[sh] = [hash((band, *sig[band * r:(band + 1) * r])) for band in range(self.bands)]
+        buckets = self._buckets
+        for band in bands:
+            buckets.setdefault((group, band), []).append(rep)
+
+    def clusters(self) -> Iterator[List[int]]:
+        """Row ids of each cluster with more than one row, in insertion order."""
+        parent = list(range(len(self._members)))
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+        sim, sh, threshold = similar, self._rep_shingles, self.threshold
+        for reps in self._buckets.values():
+            if len(reps) < 2:
+                continue
+            # compare each row with the bucket's cluster leaders only, not with every other row
+            leaders: List[int] = []
+            for rep in reps:
+                root = find(rep)
+                for lead in leaders:
+                    a = find(lead)
+                    if a == root or sim(sh[lead], sh[rep], threshold):
+                        if a != root:
+                            parent[root] = a
+                        break
+                else:
+                    leaders.append(rep)
+        groups: Dict[int, List[int]] = {}
+        for rep, members in enumerate(self._members):
+            groups.setdefault(find(rep), []).extend(members)
+        for members in groups.values():
+            if len(members) > 1:
+                yield sorted(members)
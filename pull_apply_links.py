@@ -1,21 +1,50 @@
 #!/usr/bin/env python3
 # pull_apply_links.py
 import csv
+import functools
+import hashlib
+import html
+import json
 import re
 import sys
-import urllib.parse
-from typing import Dict, List, Optional, Set, Tuple
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from itertools import compress
+from typing import Callable, Container, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
 import os
 import argparse
 import shutil
 
 import prepare_tracker
+from appstore import DB_FILE, ApplicationStore
+from bloom import BloomGuard, applied_bloom
+from httpclient import HttpClient, default_client
+from linkcheck import DEAD, LinkCache, check_links
+from neardup import NearDupIndex
+from scheduler import HostScheduler
+from urlnorm import KEY_COLUMN, canonical_key, normalizations, parse_url
 
-import requests
 from bs4 import BeautifulSoup
+try:
+    from lxml import etree
+except ImportError:  # optional: only needed for --html-backend lxml
+    etree = None
 
 # ---------- Config ----------
 RAW_MD = "https://raw.githubusercontent.com/SimplifyJobs/New-Grad-Positions/dev/README.md"
+SECTION = "Software Engineering New Grad Roles"
+
+class Source(NamedTuple):
+    """One job-list README and the H2 header of the table section to read from it."""
+    name: str
+    url: str
+    section: str = SECTION
+
+# Used when --sources isn't given. A sources file is a JSON list of
+# {"name": ..., "url": ..., "section": ...} objects ("section" is optional).
+DEFAULT_SOURCES = (Source("new-grad", RAW_MD),)
 
 ATS_WHITELIST = (
     "myworkdayjobs.com", "workday",
@@ -37,6 +66,16 @@ FLAG_EMOJIS = {
     "🔒": "closed",
     "🎓": "advanced_degree",
 }
+# Phrases (matched case-insensitively) that set each flag, on top of the emojis above.
+# Extend with --flag-phrases FILE: a JSON object of {"flag": ["phrase", ...]}.
+FLAG_PHRASES = {
+    "no_sponsorship": ["no sponsorship", "does not offer sponsorship", "sponsorship not available", "no visa"],
+    "requires_us_citizenship": ["requires u.s. citizenship", "us citizenship required", "citizens only", "u.s. citizens only"],
+    "faang_plus": ["faang"],
+    "closed": ["application is closed", "posting closed", "closed", "inactive", "not accepting",
+               "no longer accepting", "apply disabled", "unavailable", "archived", "lock"],
+    "advanced_degree": ["advanced degree", "master", "master’s", "masters", "phd", "mba"],
+}
 ARROW_GLYPHS = ("↳", "↠", "➜", "→", "⤷", "⮑", "›", "»")
 
 CSV_FIELDS = [
@@ -44,6 +83,7 @@ CSV_FIELDS = [
     "age",
     "no_sponsorship", "requires_us_citizenship", "faang_plus",
     "closed", "advanced_degree",
+    KEY_COLUMN,
 ]
 
 # ---------- US Location Filtering Config ----------
@@ -58,49 +98,119 @@ US_KEYWORDS = {'USA', 'U.S.', 'US', 'United States'}
 NON_US_KEYWORDS = {'Canada', 'UK', 'United Kingdom'}
 
 # ---------- HTTP ----------
-def fetch(url: str) -> str:
-    r = requests.get(url, timeout=30)
+class FetchCache:
+    """
+    On-disk response cache for conditional GETs.
+    Each URL gets a <sha1>.body file and a <sha1>.json file holding the
+    ETag / Last-Modified validators and the time the entry was stored.
+    """
+    def __init__(self, cache_dir: str, max_age: Optional[float] = None):
+        self.cache_dir = cache_dir
+        self.max_age = max_age      # seconds an entry is served without revalidating
+        self.hits = 0               # served from disk (fresh or 304)
+        self.misses = 0             # full body downloaded
+        self.revalidated = 0        # subset of hits answered with 304
+        self._lock = threading.Lock()  # sources are fetched from several threads
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def count(self, hit: bool, revalidated: bool = False) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.revalidated += revalidated
+            else:
+                self.misses += 1
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        h = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, h + ".body"), os.path.join(self.cache_dir, h + ".json")
+
+    def load(self, url: str) -> Tuple[Optional[Dict], Optional[str]]:
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, encoding="utf-8") as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def is_fresh(self, meta: Dict) -> bool:
+        if self.max_age is None:
+            return False
+        return time.time() - meta.get("stored_at", 0) <= self.max_age
+
+    def store(self, url: str, body: str, headers) -> None:
+        body_path, meta_path = self._paths(url)
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "stored_at": time.time(),
+        }
+        # write body first so a crash never leaves metadata pointing at a stale body
+        for path, payload in ((body_path, body), (meta_path, json.dumps(meta))):
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+
+    def touch(self, url: str, meta: Dict) -> None:
+        _, meta_path = self._paths(url)
+        meta = dict(meta, stored_at=time.time())
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+def fetch(url: str, cache: Optional[FetchCache] = None, client: Optional[HttpClient] = None) -> str:
+    client = client or default_client()
+    if cache is None:
+        r = client.get(url)
+        r.raise_for_status()
+        return r.text
+
+    meta, body = cache.load(url)
+    if meta is not None and cache.is_fresh(meta):
+        cache.count(hit=True)
+        return body
+
+    headers = {}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    r = client.get(url, headers=headers)
+    if r.status_code == 304 and meta is not None:
+        cache.count(hit=True, revalidated=True)
+        cache.touch(url, meta)
+        return body
     r.raise_for_status()
+    cache.count(hit=False)
+    cache.store(url, r.text, r.headers)
     return r.text
 
-# ---------- URL helpers ----------
-def strip_tracking(u: str) -> str:
+def iter_lines(url: str, cache: Optional[FetchCache] = None, client: Optional[HttpClient] = None) -> Iterator[str]:
+    """
+    Yield the document at url line by line as it downloads. Closing the generator
+    early drops the connection, so the rest of the body is never fetched.
+    With a cache the full body is needed on disk anyway, so lines come from fetch().
+    """
+    if cache is not None:
+        yield from fetch(url, cache, client).splitlines()
+        return
+    lines = (client or default_client()).iter_lines(url)
     try:
-        p = urllib.parse.urlparse(u)
-    except Exception:
-        return u or ""
-    if not p.query:
-        return u or ""
-    keep = []
-    for k, v in urllib.parse.parse_qsl(p.query, keep_blank_values=True):
-        lk, lv = (k or "").lower(), (v or "").lower()
-        if lk.startswith("utm_"):
-            continue
-        if "simplify" in lk or "simplify" in lv:
-            continue
-        keep.append((k, v))
-    q = urllib.parse.urlencode(keep)
-    out = urllib.parse.urlunparse(p._replace(query=q))
-    if not q:
-        out = f"{p.scheme}://{p.netloc}{p.path}"
-    return out
+        yield from lines
+    finally:
+        lines.close()
 
+# ---------- URL helpers ----------
 def is_direct_ats(u: str) -> bool:
     low = (u or "").lower()
     if any(bad in low for bad in EXCLUDE_DOMAINS):
         return False
     return any(dom in low for dom in ATS_WHITELIST)
 
-def norm_url_for_dedupe(u: str) -> str:
-    try:
-        p = urllib.parse.urlparse(u or "")
-        return urllib.parse.urlunparse((
-            (p.scheme or "https").lower(), (p.netloc or "").lower(), (p.path or "").rstrip("/"),
-            "", p.query or "", ""
-        ))
-    except Exception:
-        return (u or "").rstrip("/").lower()
-
 # ---------- Text helpers ----------
 def is_arrow_cell(s: str) -> bool:
     s = (s or "").strip()
@@ -108,48 +218,202 @@ def is_arrow_cell(s: str) -> bool:
         return True
     return bool(re.fullmatch(r"(?:-&gt;|->|→|↳)\s*", s))
 
+_MD_LINK_RE = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+# single-codepoint flag emojis go through str.translate; multi-codepoint ones (🇺🇸) need replace
+_EMOJI_DELETE = {ord(e): None for e in FLAG_EMOJIS if len(e) == 1}
+_EMOJI_MULTI = tuple(e for e in FLAG_EMOJIS if len(e) > 1)
+
 def clean_md_text(md: str) -> str:
-    md = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", md or "")
-    return re.sub(r"\s+", " ", md).strip()
+    md = md or ""
+    if "[" in md:
+        md = _MD_LINK_RE.sub(r"\1", md)
+    return " ".join(md.split())
+
+def clean_md_cell(md: str) -> str:
+    """clean_md_text() and strip_flag_emojis() fused: links, flag emojis and whitespace in one go."""
+    md = md or ""
+    if "[" in md:
+        md = _MD_LINK_RE.sub(r"\1", md)
+    md = md.translate(_EMOJI_DELETE)
+    for e in _EMOJI_MULTI:
+        if e in md:
+            md = md.replace(e, "")
+    return " ".join(md.split())
+
+# ---------- HTML fragment scanning ----------
+_TAG_RE = re.compile(r"<(/?)([a-zA-Z][\w-]*)([^<>]*)>")
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+              "link", "meta", "param", "source", "track", "wbr"}
+_ATTR_RE = re.compile(r"""([^\s=/>]+)\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+)""")
+# a tag's attributes with every quote closed; otherwise the tag really runs on past the '>'
+_ATTRS_CLOSED_RE = re.compile(r"""(?:[^"']|"[^"]*"|'[^']*')*""")
+# '&name' / '&#n' without its ';': html.unescape and html.parser resolve these differently
+_BARE_CHARREF_RE = re.compile(r"&(?=#?\w)(?!#?\w+;)")
+
+def _scan_html_fragment_bs4(fragment: str) -> Tuple[str, List[str], List[str]]:
+    soup = BeautifulSoup(fragment, "html.parser")
+    return (soup.get_text(" ", strip=True),
+            [img.get("alt", "") for img in soup.find_all("img")],
+            [a["href"] for a in soup.find_all("a", href=True)])
+
+def scan_html_fragment(fragment: str) -> Tuple[str, List[str], List[str]]:
+    """
+    Return (visible text, <img alt> values, <a href> values) for a small table-cell
+    fragment, matching BeautifulSoup's get_text(" ", strip=True) / find_all output.
+    Anything the tokenizer can't vouch for (stray '<'/'>', comments, script/style,
+    an unterminated attribute quote, a character reference without its ';') goes
+    through bs4 instead.
+    """
+    texts: List[str] = []
+    alts: List[str] = []
+    hrefs: List[str] = []
+    pos = 0
+    for m in _TAG_RE.finditer(fragment):
+        texts.append(fragment[pos:m.start()])
+        pos = m.end()
+        closing, name = m.group(1), m.group(2).lower()
+        if name in ("script", "style") or (closing and name in _VOID_TAGS):
+            # html.parser treats these specially (raw text / stray </br>); let bs4 decide
+            return _scan_html_fragment_bs4(fragment)
+        if not _ATTRS_CLOSED_RE.fullmatch(m.group(3)):
+            return _scan_html_fragment_bs4(fragment)
+        if closing or name not in ("img", "a"):
+            continue
+        attrs = {k.lower(): v for k, v in _ATTR_RE.findall(m.group(3))}
+        if name == "img":
+            alts.append(html.unescape(attrs.get("alt", "").strip("\"'")))
+        elif "href" in attrs:
+            hrefs.append(html.unescape(attrs["href"].strip("\"'")))
+    texts.append(fragment[pos:])
+    out = []
+    for t in texts:
+        if "<" in t or ">" in t:
+            return _scan_html_fragment_bs4(fragment)
+        if "&" in t:
+            if _BARE_CHARREF_RE.search(t):
+                return _scan_html_fragment_bs4(fragment)
+            t = html.unescape(t)
+        t = t.strip()
+        if t:
+            out.append(t)
+    return " ".join(out), alts, hrefs
 
 def strip_flag_emojis(s: str) -> str:
-    for e in FLAG_EMOJIS.keys():
-        s = s.replace(e, "")
-    return re.sub(r"\s+", " ", s).strip()
+    s = s.translate(_EMOJI_DELETE)
+    for e in _EMOJI_MULTI:
+        if e in s:
+            s = s.replace(e, "")
+    return " ".join(s.split())
+
+_AGE_UNITS = {
+    "h": 0, "hr": 0, "hrs": 0, "hour": 0, "hours": 0,
+    "d": 1, "day": 1, "days": 1,
+    "w": 7, "wk": 7, "wks": 7, "week": 7, "weeks": 7,
+    "mo": 30, "mos": 30, "mth": 30, "mths": 30, "month": 30, "months": 30,
+    "y": 365, "yr": 365, "yrs": 365, "year": 365, "years": 365,
+}
+# longest spellings first so "months" isn't cut short at "mo"
+_AGE_RE = re.compile(r"\b(\d+)\s*(" + "|".join(sorted(_AGE_UNITS, key=len, reverse=True)) + r")\b")
+_AGE_MEMO: Dict[str, Optional[int]] = {}
 
 def age_to_days(s: str) -> Optional[int]:
-    s = (s or "").strip().lower()
-    if not s:
-        return None
-    s = (s.replace("mth", "mo")
-         .replace("year", "yr").replace("years", "yr")
-         .replace("month", "mo").replace("months", "mo")
-         .replace("week", "w").replace("weeks", "w")
-         .replace("day", "d").replace("days", "d")
-         .replace("hour", "h").replace("hours", "h"))
-    m = re.search(r"\b(\d+)\s*(h|d|w|mo|yr|y)\b", s) or re.search(r"\b(\d+)(h|d|w|mo|yr|y)\b", s)
-    if not m:
-        return None
-    n, unit = int(m.group(1)), m.group(2)
-    if unit == "y": unit = "yr"
-    return { "h": 0, "d": n, "w": n*7, "mo": n*30, "yr": n*365 }.get(unit, None)
+    """Posting age ("0d", "3 days", "1mo", "2 yrs", ...) in whole days; hours count as 0."""
+    try:
+        return _AGE_MEMO[s]
+    except KeyError:
+        pass
+    m = _AGE_RE.search((s or "").strip().lower())
+    days = int(m.group(1)) * _AGE_UNITS[m.group(2)] if m else None
+    if len(_AGE_MEMO) >= 4096:
+        _AGE_MEMO.clear()
+    _AGE_MEMO[s] = days
+    return days
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex for a set of literals with shared prefixes factored out, longest match first."""
+    trie: Dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    def build(node: Dict) -> str:
+        alts = [re.escape(ch) + build(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+    return build(trie)
+
+class FlagMatcher:
+    """
+    Every flag phrase and emoji compiled into one trie-shaped regex, so a single
+    pass over the lowercased text finds all flag categories regardless of how many
+    phrases are configured.
+    """
+    def __init__(self, phrases: Dict[str, Iterable[str]]):
+        self.phrases: Dict[str, Set[str]] = {}
+        self.add(phrases)
+
+    def add(self, phrases: Dict[str, Iterable[str]]) -> None:
+        """Add {"flag": ["phrase", ...]}; raises ValueError (and adds nothing) if it has any other shape."""
+        if not isinstance(phrases, dict):
+            raise ValueError(f'expected an object of {{"flag": ["phrase", ...]}}, got {type(phrases).__name__}')
+        for flag, words in phrases.items():
+            if flag not in FLAG_EMOJIS.values():
+                raise ValueError(f"unknown flag {flag!r} (expected one of: {', '.join(FLAG_EMOJIS.values())})")
+            # a bare string would register each of its characters as a phrase
+            if not isinstance(words, (list, tuple, set, frozenset)):
+                raise ValueError(f"{flag!r}: expected a list of phrases, got {type(words).__name__}")
+            bad = [w for w in words if not isinstance(w, str) or not w.strip()]
+            if bad:
+                raise ValueError(f"{flag!r}: phrases must be non-empty strings, got {bad[0]!r}")
+        for flag, words in phrases.items():
+            self.phrases.setdefault(flag, set()).update(w.lower() for w in words)
+        by_phrase: Dict[str, Set[str]] = {}
+        for flag, words in self.phrases.items():
+            for w in words:
+                by_phrase.setdefault(w, set()).add(flag)
+        # only the longest phrase at a position is reported, so a hit also counts every phrase nested in it;
+        # after a hit on a phrase another one can start inside of (and run past), match() looks again from
+        # the next character instead of after the hit, so overlapping phrases are seen too
+        self._implied = {
+            w: frozenset(f for other, flags in by_phrase.items() if other in w for f in flags)
+            for w in by_phrase
+        }
+        prefixes = {w[:k] for w in by_phrase for k in range(1, len(w) + 1)}
+        self._overlapped = {w: any(w[i:] in prefixes for i in range(1, len(w))) for w in by_phrase}
+        self._re = re.compile(_trie_pattern(by_phrase))
+        self._n_flags = len(self.phrases)
+
+    def signature(self) -> str:
+        """Stable hash of the configured phrases, for invalidating cached parse results."""
+        blob = json.dumps({k: sorted(v) for k, v in self.phrases.items()}, sort_keys=True)
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+    def match(self, low: str) -> Set[str]:
+        found: Set[str] = set()
+        search, implied, overlapped = self._re.search, self._implied, self._overlapped
+        m = search(low)
+        while m is not None:
+            w = m.group(0)
+            found |= implied[w]
+            if len(found) == self._n_flags:
+                break
+            m = search(low, m.start() + 1 if overlapped[w] else m.end())
+        return found
+
+FLAG_MATCHER = FlagMatcher({k: [e] for e, k in FLAG_EMOJIS.items()})
+FLAG_MATCHER.add(FLAG_PHRASES)
+
+def load_flag_phrases(path: str) -> None:
+    """Add user phrases from a JSON file of {"flag": ["phrase", ...]} to FLAG_MATCHER."""
+    with open(path, encoding="utf-8") as f:
+        FLAG_MATCHER.add(json.load(f))
 
 def detect_flags(text: str) -> Dict[str, bool]:
-    out = {k: False for k in FLAG_EMOJIS.values()}
-    for e, k in FLAG_EMOJIS.items():
-        if e in text:
-            out[k] = True
-    low = (text or "").lower()
-    if any(t in low for t in ["no sponsorship", "does not offer sponsorship", "sponsorship not available", "no visa"]):
-        out["no_sponsorship"] = True
-    if any(t in low for t in ["requires u.s. citizenship", "us citizenship required", "citizens only", "u.s. citizens only"]):
-        out["requires_us_citizenship"] = True
-    if "faang" in low: out["faang_plus"] = True
-    if any(t in low for t in ["application is closed", "posting closed", "closed", "inactive", "not accepting", "no longer accepting", "apply disabled", "unavailable", "archived", "lock"]):
-        out["closed"] = True
-    if any(t in low for t in ["advanced degree", "master", "master’s", "masters", "phd", "mba"]):
-        out["advanced_degree"] = True
-    return out
+    found = FLAG_MATCHER.match((text or "").lower())
+    return {k: k in found for k in FLAG_EMOJIS.values()}
 
 def flags_emoji_row(row: Dict) -> str:
     buf = []
@@ -159,8 +423,8 @@ def flags_emoji_row(row: Dict) -> str:
     return "".join(buf)
 
 # ---------- README slicing ----------
-def extract_active_swe(md: str) -> str:
-    start_m = re.search(r"^##\s*Software Engineering New Grad Roles.*?$", md, re.I | re.M)
+def extract_active_swe(md: str, section: str = SECTION) -> str:
+    start_m = re.search(rf"^##\s*{re.escape(section)}.*?$", md, re.I | re.M)
     if not start_m:
         return md
     start = start_m.start()
@@ -174,64 +438,252 @@ def extract_active_swe(md: str) -> str:
         end = len(md)
     return md[start:end]
 
+SECTION_INACTIVE_RE = re.compile(r"^###\s*Inactive roles", re.I)
+H2_RE = re.compile(r"^##\s+")
+
+@functools.lru_cache(maxsize=None)
+def section_start_re(section: str) -> "re.Pattern[str]":
+    return re.compile(rf"^##\s*{re.escape(section)}", re.I)
+
+def iter_active_swe(lines: Iterable[str], section: str = SECTION) -> Iterator[str]:
+    """
+    Streaming counterpart of extract_active_swe(): yield the lines of the active
+    section and return at "Inactive roles" (or the next H2) without reading further.
+    If the header never shows up, every line is yielded instead (the whole document,
+    as extract_active_swe() returns), so a headerless HTML table is still parsed.
+    """
+    start_re = section_start_re(section)
+    lines = iter(lines)     # a list would restart at the top in the second loop
+    pending: List[str] = []
+    for ln in lines:
+        if start_re.match(ln):
+            break
+        pending.append(ln)
+    else:
+        yield from pending
+        return
+    pending.clear()
+    yield ln
+    for ln in lines:
+        if SECTION_INACTIVE_RE.match(ln) or H2_RE.match(ln):
+            return
+        yield ln
+
 # ---------- Table parsing ----------
 def extract_first_ats_url_from_cell(cell_md: str) -> Optional[str]:
     urls = re.findall(r"\((https?://[^)]+)\)", cell_md or "")
-    urls += [u.rstrip(")|,") for u in re.findall(r"https?://\S+", cell_md or "")]
+    # stop at quotes/brackets too, or an <a href="..."><img> cell yields 'https://...">'<img'
+    urls += [u.rstrip(")|,") for u in re.findall(r"https?://[^\s\"'<>]+", cell_md or "")]
     for u in urls:
         if is_direct_ats(u):
             return u
     return None
 
-def parse_markdown_table(fragment: str) -> List[Dict]:
-    rows: List[Dict] = []
+# bump when parse_table_line() output changes, so stale cached rows are dropped
+ROW_CACHE_VERSION = 4
+
+class RowCache:
+    """
+    Parsed table lines from the previous run, keyed by a hash of the raw line.
+    parse_markdown_table() only parses lines whose hash is not in here; after a
+    run, added/removed/unchanged describe how the section changed since last time.
+    A cache written under a different signature (e.g. other flag phrases) is discarded.
+    """
+    def __init__(self, path: Optional[str] = None, signature: str = ""):
+        self.path = path
+        self.signature = signature
+        self.lines: Dict[str, Optional[Dict]] = {}
+        self.added = 0
+        self.removed = 0
+        self.unchanged = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("signature") == signature:
+                    self.lines = data["lines"]
+            except (OSError, ValueError, KeyError, AttributeError):
+                self.lines = {}
+
+    def update(self, current: Dict[str, Optional[Dict]]) -> None:
+        prev, cur = set(self.lines), set(current)
+        self.added = len(cur - prev)
+        self.removed = len(prev - cur)
+        self.unchanged = len(cur & prev)
+        # keep only lines still present so the cache tracks the live section
+        self.lines = current
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"signature": self.signature, "lines": self.lines}, f)
+        os.replace(tmp, self.path)
+
+def line_key(ln: str) -> str:
+    return hashlib.sha1(ln.encode("utf-8")).hexdigest()
+
+def parse_table_line(ln: str) -> Optional[Dict]:
+    """
+    Parse one markdown table line on its own, without context from earlier lines.
+    Arrow companies are resolved and duplicates dropped later in parse_markdown_table;
+    apply_url is None when the row has no direct ATS link.
+    """
+    cols = [c.strip() for c in ln.strip("|").split("|")]
+    if len(cols) < 5: return None
+    comp_cell, role_cell, loc_cell, app_cell, age_cell = cols[0], cols[1], cols[2], cols[3], cols[4]
+    app_text, app_alts, _ = scan_html_fragment(app_cell)
+    flags = detect_flags(" ".join([comp_cell, role_cell, app_text, " ".join(app_alts), age_cell]))
+    company = clean_md_cell(comp_cell)
+    title = clean_md_cell(role_cell)
+    location = clean_md_text(loc_cell)
+    age_days = age_to_days(clean_md_text(age_cell))
+    apply_url = extract_first_ats_url_from_cell(app_cell)
+    key = None
+    if apply_url:
+        parsed = parse_url(apply_url)
+        apply_url = parsed.url
+        if is_direct_ats(apply_url):
+            key = parsed.key
+        else:
+            apply_url = None
+    return {"company": company, "title": title, "location": location, "apply_url": apply_url, "age": age_days, "key": key, **flags}
+
+def iter_markdown_rows(lines: Iterable[str], row_cache: Optional[RowCache] = None,
+                       html_backend: str = "html.parser") -> Iterator[Dict]:
+    """
+    Yield parsed rows as each table line arrives. If the input holds no markdown
+    table lines at all, it is handed to parse_html_table() once exhausted.
+    """
     seen = set()
     last_company: Optional[str] = None
-    lines = [ln.strip() for ln in fragment.splitlines() if ln.strip().startswith("|") and ln.count("|") >= 5]
-    if not lines:
-        return parse_html_table(fragment)
-    body = []
-    for ln in lines:
+    current: Dict[str, Optional[Dict]] = {}
+    html_buf: Optional[List[str]] = []
+    for raw in lines:
+        ln = raw.strip()
+        if not (ln.startswith("|") and raw.count("|") >= 5):
+            if html_buf is not None:
+                html_buf.append(raw)
+            continue
+        html_buf = None
         if re.match(r"^\|\s*-+\s*\|", ln): continue
         if re.search(r"\|\s*Company\s*\|\s*Role\s*\|\s*Location\s*\|\s*Application\s*\|\s*Age\s*\|", ln, re.I): continue
-        body.append(ln)
-    for ln in body:
-        cols = [c.strip() for c in ln.strip("|").split("|")]
-        if len(cols) < 5: continue
-        comp_cell, role_cell, loc_cell, app_cell, age_cell = cols[0], cols[1], cols[2], cols[3], cols[4]
-        app_soup = BeautifulSoup(app_cell, "html.parser")
-        app_alts = " ".join(img.get("alt", "") for img in app_soup.find_all("img"))
-        flags = detect_flags(" ".join([comp_cell, role_cell, app_soup.get_text(" ", strip=True), app_alts, age_cell]))
-        raw_company = clean_md_text(comp_cell)
-        company = strip_flag_emojis(raw_company)
+        if row_cache is not None:
+            k = line_key(ln)
+            if k in row_cache.lines:
+                parsed = row_cache.lines[k]
+            else:
+                parsed = parse_table_line(ln)
+            current[k] = parsed
+        else:
+            parsed = parse_table_line(ln)
+        if parsed is None: continue
+        company = parsed["company"]
         if is_arrow_cell(company):
             company = last_company or ""
         else:
             if company: last_company = company
-        title = strip_flag_emojis(clean_md_text(role_cell))
-        location = clean_md_text(loc_cell)
-        age_days = age_to_days(clean_md_text(age_cell))
-        apply_url = extract_first_ats_url_from_cell(app_cell)
-        if not apply_url: continue
-        cleaned = strip_tracking(apply_url)
-        if not is_direct_ats(cleaned): continue
-        key = norm_url_for_dedupe(cleaned)
+        if not parsed["apply_url"]: continue
+        # caches written before keys were stored on the row lack "key"
+        key = parsed.get("key") or canonical_key(parsed["apply_url"])
         if key in seen: continue
         seen.add(key)
-        rows.append({"company": company, "title": title, "location": location, "apply_url": cleaned, "age": age_days, **flags})
-    return rows
+        yield {**parsed, "company": company, "key": key}
+    if html_buf is not None:
+        yield from parse_html_table("\n".join(html_buf), html_backend)
+    elif row_cache is not None:
+        row_cache.update(current)
+
+def parse_markdown_table(fragment: str, row_cache: Optional[RowCache] = None) -> List[Dict]:
+    return list(iter_markdown_rows(fragment.splitlines(), row_cache))
+
+HTML_BACKENDS = ("html.parser", "lxml")
+
+# (company, role, location, application, age) cell texts, img alts, application hrefs
+HtmlCells = Tuple[str, str, str, str, str, str, List[str]]
 
-def parse_html_table(fragment: str) -> List[Dict]:
+def _iter_html_cells_bs4(fragment: str) -> Iterator[HtmlCells]:
     soup = BeautifulSoup(fragment, "html.parser")
-    rows: List[Dict] = []
-    seen = set()
-    last_company: Optional[str] = None
     for tr in soup.find_all("tr"):
         tds = tr.find_all("td")
         if len(tds) < 5: continue
         comp_td, role_td, loc_td, app_td, age_td = tds[0], tds[1], tds[2], tds[3], tds[4]
-        comp_text, role_text, loc_text, app_text, age_text = comp_td.get_text(" ", strip=True), role_td.get_text(" ", strip=True), loc_td.get_text(" ", strip=True), app_td.get_text(" ", strip=True), age_td.get_text(" ", strip=True)
         alts = " ".join(img.get("alt", "") for img in (comp_td.find_all("img") + role_td.find_all("img") + app_td.find_all("img")))
+        hrefs = [a["href"] for a in app_td.find_all("a", href=True)]
+        yield (comp_td.get_text(" ", strip=True), role_td.get_text(" ", strip=True), loc_td.get_text(" ", strip=True),
+               app_td.get_text(" ", strip=True), age_td.get_text(" ", strip=True), alts, hrefs)
+
+_HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+_END_BR_RE = re.compile(r"</br\s*>", re.I)
+
+def _html_trees_agree(fragment: str) -> bool:
+    """
+    True if every tag is explicitly closed in order, so libxml2 has nothing to repair and
+    builds the same tree as html.parser. Implied </td>/</tr>, stray end tags and
+    script/style are where the two parsers disagree.
+    """
+    stripped = _HTML_COMMENT_RE.sub("", fragment)
+    stack: List[str] = []
+    pos = 0
+    for m in _TAG_RE.finditer(stripped):
+        if "<" in stripped[pos:m.start()]:
+            return False
+        pos = m.end()
+        closing, name = m.group(1), m.group(2).lower()
+        if name in ("script", "style"):
+            return False
+        if (name == "a" and m.group(3).lower().count("href") > 1) or (name == "img" and m.group(3).lower().count("alt") > 1):
+            return False  # repeated attribute: html.parser keeps the last value, libxml2 the first
+        if name in _VOID_TAGS:
+            if closing and name != "br": return False
+        elif closing:
+            if not stack or stack.pop() != name: return False
+        elif m.group(3).endswith("/"):
+            return False
+        else:
+            stack.append(name)
+    return not stack and "<" not in stripped[pos:]
+
+def _iter_html_cells_lxml(fragment: str) -> Iterator[HtmlCells]:
+    """
+    One pass over lxml's C tree; yields exactly what _iter_html_cells_bs4() does.
+    Markup the two parsers would repair differently goes through bs4 instead.
+    """
+    if etree is None:
+        raise RuntimeError("the lxml HTML backend needs lxml (pip install lxml)")
+    if not _html_trees_agree(fragment):
+        yield from _iter_html_cells_bs4(fragment)
+        return
+    # the README writes line breaks as </br>; html.parser splits the text there, libxml2 would drop it
+    root = etree.HTML(_END_BR_RE.sub("<br>", fragment))
+    if root is None: return
+    for tr in root.iter("tr"):
+        texts: List[str] = []
+        alts: List[str] = []
+        hrefs: List[str] = []
+        for i, td in enumerate(tr.iter("td")):
+            if i < 5:
+                # get_text(" ", strip=True): stripped, non-empty strings joined by a space
+                texts.append(" ".join(t for t in map(str.strip, td.itertext()) if t))
+                if i in (0, 1, 3):
+                    alts.extend(img.get("alt", "") for img in td.iter("img"))
+                if i == 3:
+                    hrefs = [h for h in (a.get("href") for a in td.iter("a")) if h is not None]
+        if len(texts) < 5: continue
+        yield texts[0], texts[1], texts[2], texts[3], texts[4], " ".join(alts), hrefs
+
+def parse_html_table(fragment: str, backend: str = "html.parser") -> List[Dict]:
+    if backend == "lxml":
+        cells = _iter_html_cells_lxml(fragment)
+    elif backend == "html.parser":
+        cells = _iter_html_cells_bs4(fragment)
+    else:
+        raise ValueError(f"unknown HTML backend {backend!r} (expected one of {', '.join(HTML_BACKENDS)})")
+    rows: List[Dict] = []
+    seen = set()
+    last_company: Optional[str] = None
+    for comp_text, role_text, loc_text, app_text, age_text, alts, hrefs in cells:
         flags = detect_flags(f"{comp_text} {role_text} {app_text} {alts} {age_text}")
         company = strip_flag_emojis(comp_text)
         if is_arrow_cell(company):
@@ -241,75 +693,232 @@ def parse_html_table(fragment: str) -> List[Dict]:
         title = strip_flag_emojis(role_text)
         age_days = age_to_days(age_text)
         apply_url = None
-        for a in app_td.find_all("a", href=True):
-            if is_direct_ats(a["href"]):
-                apply_url = a["href"].strip()
+        for href in hrefs:
+            if is_direct_ats(href):
+                apply_url = href.strip()
                 break
         if not apply_url: continue
-        cleaned = strip_tracking(apply_url)
+        parsed = parse_url(apply_url)
+        cleaned = parsed.url
         if not is_direct_ats(cleaned): continue
-        key = norm_url_for_dedupe(cleaned)
+        key = parsed.key
         if key in seen: continue
         seen.add(key)
-        rows.append({"company": company, "title": title, "location": loc_text, "apply_url": cleaned, "age": age_days, **flags})
+        rows.append({"company": company, "title": title, "location": loc_text, "apply_url": cleaned, "age": age_days, "key": key, **flags})
     return rows
 
-# ---------- Pipeline ----------
-def load_active_swe_rows() -> List[Dict]:
-    md = fetch(RAW_MD)
-    section = extract_active_swe(md)
-    rows = parse_markdown_table(section)
-    return rows
+# ---------- Row model ----------
+FLAG_NAMES = tuple(FLAG_EMOJIS.values())
+FLAG_BITS = {name: 1 << i for i, name in enumerate(FLAG_NAMES)}
+NO_AGE = -1
+# sort priority of the sponsorship / citizenship / FAANG+ bits: flagged rows first
+_SORT_PRIO = [tuple(0 if bits & FLAG_BITS[n] else 1 for n in ("no_sponsorship", "requires_us_citizenship", "faang_plus"))
+              for bits in range(1 << len(FLAG_NAMES))]
 
-def dedupe(rows: List[Dict]) -> List[Dict]:
-    out, seen = [], set()
-    for r in rows:
-        key = norm_url_for_dedupe(r["apply_url"])
-        if key in seen: continue
-        seen.add(key)
-        out.append(r)
-    return out
+class JobTable:
+    """
+    Columnar job rows: one list/array per field instead of a dict per row.
+    Company and location strings are interned (they repeat heavily), the five
+    flags are packed into one byte per row and ages live in an int array
+    (NO_AGE when unknown). Filters and sorts work on whole columns and return
+    new tables via select()/take().
+    """
+    __slots__ = ("companies", "titles", "locations", "urls", "keys", "ages", "flags")
+
+    def __init__(self):
+        self.companies: List[str] = []
+        self.titles: List[str] = []
+        self.locations: List[str] = []
+        self.urls: List[str] = []
+        self.keys: List[str] = []        # canonical_key(apply_url)
+        self.ages = array("i")
+        self.flags = array("B")
+
+    def __len__(self) -> int:
+        return len(self.urls)
 
-# ---------- Function to read previously applied jobs ----------
-def load_applied_urls(applied_csv_path: str) -> Set[str]:
-    """Reads the CSV with application tracking and returns a set of normalized URLs for jobs already applied to."""
-    applied_urls = set()
-    if not applied_csv_path or not os.path.exists(applied_csv_path):
-        # missing file is not an error; upstream code will handle empty set
-        return applied_urls
+    def append(self, row: Dict) -> None:
+        self.companies.append(sys.intern(row.get("company") or ""))
+        self.titles.append(row.get("title") or "")
+        self.locations.append(sys.intern(row.get("location") or ""))
+        self.urls.append(row["apply_url"])
+        self.keys.append(row.get("key") or canonical_key(row["apply_url"]))
+        age = row.get("age")
+        self.ages.append(NO_AGE if age is None else age)
+        bits = 0
+        for name, bit in FLAG_BITS.items():
+            if row.get(name):
+                bits |= bit
+        self.flags.append(bits)
 
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> "JobTable":
+        t = cls()
+        for r in rows:
+            t.append(r)
+        return t
+
+    def extend(self, other: "JobTable") -> None:
+        """Append all of other's rows, column by column."""
+        for col in self.__slots__:
+            getattr(self, col).extend(getattr(other, col))
+
+    def take(self, idx: Sequence[int]) -> "JobTable":
+        """New table with the rows at idx, in that order."""
+        t = JobTable()
+        for col in self.__slots__:
+            src = getattr(self, col)
+            vals = [src[i] for i in idx]
+            setattr(t, col, array(src.typecode, vals) if isinstance(src, array) else vals)
+        return t
+
+    def select(self, mask: Iterable[bool]) -> "JobTable":
+        """New table with the rows where mask is true."""
+        return self.take(list(compress(range(len(self)), mask)))
+
+    def set_flag(self, i: int, name: str) -> None:
+        self.flags[i] |= FLAG_BITS[name]
+
+    def has_flag(self, name: str) -> List[bool]:
+        bit = FLAG_BITS[name]
+        return [bool(f & bit) for f in self.flags]
+
+    def rows(self) -> Iterator[Dict]:
+        """Rows back as dicts (flags as booleans, unknown age as None), e.g. for writing CSV."""
+        for i in range(len(self)):
+            bits = self.flags[i]
+            age = self.ages[i]
+            yield {
+                "company": self.companies[i], "title": self.titles[i], "location": self.locations[i],
+                "apply_url": self.urls[i], "key": self.keys[i], "age": None if age == NO_AGE else age,
+                **{name: bool(bits & bit) for name, bit in FLAG_BITS.items()},
+            }
+
+# ---------- Pipeline ----------
+def stream_active_swe_rows(cache: Optional[FetchCache] = None, row_cache: Optional[RowCache] = None,
+                           html_backend: str = "html.parser", source: Optional[Source] = None,
+                           client: Optional[HttpClient] = None) -> Iterator[Dict]:
+    source = source or DEFAULT_SOURCES[0]
+    lines = iter_lines(source.url, cache, client)
     try:
-        with open(applied_csv_path, "r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            if not reader.fieldnames:
-                return applied_urls
-            # Normalize field names: use lowercase mapping to original header strings
-            header_map = {name.lower().strip(): name for name in reader.fieldnames}
-            applied_key = header_map.get("applied", None)
-            url_key = header_map.get("apply_url", None)
-            # fallback: try to find any column with 'url' or 'link' in the name
-            if not url_key:
-                for k_lower, orig in header_map.items():
-                    if "url" in k_lower or "link" in k_lower:
-                        url_key = orig
-                        break
-            for row in reader:
-                if applied_key:
-                    if (row.get(applied_key) or "").strip().upper() != "TRUE":
-                        continue
-                else:
-                    # if no 'applied' column, don't mark anything as applied
-                    continue
-                if not url_key:
-                    continue
-                url = row.get(url_key)
-                if url:
-                    applied_urls.add(norm_url_for_dedupe(strip_tracking(url)))
-    except Exception:
-        # on read error, return empty applied set (safe fallback)
-        return set()
+        yield from iter_markdown_rows(iter_active_swe(lines, source.section), row_cache, html_backend)
+    finally:
+        lines.close()
+
+def load_active_swe_rows(cache: Optional[FetchCache] = None, row_cache: Optional[RowCache] = None,
+                         html_backend: str = "html.parser", source: Optional[Source] = None,
+                         client: Optional[HttpClient] = None) -> JobTable:
+    table = JobTable.from_rows(stream_active_swe_rows(cache, row_cache, html_backend, source, client))
+    if row_cache is not None:
+        row_cache.save()
+    return table
 
-    return applied_urls
+SOURCE_NAME_RE = re.compile(r"^[\w.-]+$")
+
+def load_sources(path: str) -> List[Source]:
+    """Read a sources file (see DEFAULT_SOURCES). Raises ValueError if it is malformed."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list) or not data:
+        raise ValueError("expected a non-empty JSON list of sources")
+    sources: List[Source] = []
+    for i, entry in enumerate(data):
+        if not isinstance(entry, dict) or not isinstance(entry.get("url"), str):
+            raise ValueError(f"source #{i + 1}: expected an object with a \"url\"")
+        name = entry.get("name") or f"source{i + 1}"
+        # the name is part of the row cache file name
+        if not SOURCE_NAME_RE.match(name):
+            raise ValueError(f"source #{i + 1}: name {name!r} may only contain letters, digits, '_', '-' and '.'")
+        if any(src.name == name for src in sources):
+            raise ValueError(f"duplicate source name {name!r}")
+        sources.append(Source(name, entry["url"], entry.get("section") or SECTION))
+    return sources
+
+class SourceResult(NamedTuple):
+    source: Source
+    table: Optional[JobTable]
+    seconds: float
+    error: Optional[Exception] = None
+
+def load_sources_rows(sources: Sequence[Source], cache: Optional[FetchCache] = None,
+                      row_cache_for: Optional[Callable[[Source], RowCache]] = None,
+                      html_backend: str = "html.parser",
+                      client: Optional[HttpClient] = None) -> Tuple[JobTable, List[SourceResult]]:
+    """
+    Fetch and parse every source on its own thread, so the run takes about as long as
+    the slowest source. Rows are concatenated in registry order; dedupe() then keeps
+    the first source's copy of a job listed in several. A source that fails is
+    reported and skipped, unless they all fail.
+    """
+    def load(source: Source) -> SourceResult:
+        t0 = time.perf_counter()
+        try:
+            row_cache = row_cache_for(source) if row_cache_for else None
+            table = load_active_swe_rows(cache, row_cache, html_backend, source, client)
+        except Exception as e:
+            return SourceResult(source, None, time.perf_counter() - t0, e)
+        return SourceResult(source, table, time.perf_counter() - t0)
+
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        results = list(pool.map(load, sources))
+    if all(res.error is not None for res in results):
+        raise results[0].error
+    combined = JobTable()
+    for res in results:
+        if res.table is not None:
+            combined.extend(res.table)
+    return combined, results
+
+def dedupe(table: JobTable, fuzzy: bool = False, dropped: Optional[Dict[str, int]] = None) -> JobTable:
+    """
+    Keep the first row of each job. Rows are the same job when their URLs share a
+    canonical key or an ATS job id (urlnorm.ats_job). With fuzzy, a row whose URL
+    has no ATS job id is also dropped when it is a near-duplicate (neardup: same
+    company, similar title and location) of a kept row on another host, i.e. the
+    same posting mirrored on the company's site. Each kept row absorbs at most one
+    such mirror, and rows on the same host are never merged (different paths there
+    are different reqs). Drop counts go into dropped.
+    """
+    seen: Set[str] = set()
+    keep = []
+    same_job = 0
+    for i, (key, url) in enumerate(zip(table.keys, table.urls)):
+        if key in seen: continue
+        seen.add(key)
+        job = parse_url(url).job
+        if job is not None:
+            if job.key in seen:
+                same_job += 1
+                continue
+            seen.add(job.key)
+        keep.append(i)
+    near = set()
+    if fuzzy and len(keep) > 1:
+        index = NearDupIndex()
+        for pos, i in enumerate(keep):
+            index.add(pos, table.companies[i].casefold().strip(), table.titles[i], table.locations[i])
+        def host(i: int) -> str:
+            return parse_url(table.urls[i]).host
+        for cluster in index.clusters():
+            rows = [keep[pos] for pos in cluster]
+            # hosts of kept rows that haven't absorbed a mirror yet; rows with an ATS id are always kept
+            open_hosts = [host(i) for i in rows if parse_url(table.urls[i]).job is not None]
+            for i in rows:
+                if parse_url(table.urls[i]).job is not None:
+                    continue
+                h = host(i)
+                match = next((n for n, other in enumerate(open_hosts) if other != h), None)
+                if match is None:
+                    open_hosts.append(h)
+                else:
+                    del open_hosts[match]
+                    near.add(i)
+        keep = [i for i in keep if i not in near]
+    if dropped is not None:
+        dropped["duplicate (same ATS job)"] = same_job
+        if fuzzy:
+            dropped["near-duplicate"] = len(near)
+    return table.take(keep)
 
 # ---------- Archive helper ----------
 def archive_file(src_path: str, dest_dir: str, base_name: str) -> Optional[str]:
@@ -334,108 +943,220 @@ def archive_file(src_path: str, dest_dir: str, base_name: str) -> Optional[str]:
         return None
 
 # ---------- Enhanced filtering function ----------
+_NON_US_RE = re.compile("|".join(re.escape(k.upper()) for k in NON_US_KEYWORDS))
+_US_KEYWORD_RE = re.compile("|".join(re.escape(k.upper()) for k in US_KEYWORDS))
+# whole-word state codes, so "CA" doesn't match inside "CANADA"
+_US_STATE_RE = re.compile(r"\b(?:" + "|".join(sorted(US_STATE_CODES)) + r")\b")
+
+@functools.lru_cache(maxsize=4096)
 def is_us_location(location: str) -> bool:
     """Checks if a location string corresponds to a US location."""
     loc_upper = (location or "").upper()
 
     # Exclude if a non-US keyword is present
-    if any(keyword.upper() in loc_upper for keyword in NON_US_KEYWORDS):
+    if _NON_US_RE.search(loc_upper):
         return False
 
-    # Include if a US keyword is present
-    if any(keyword.upper() in loc_upper for keyword in US_KEYWORDS):
+    # Include if a US keyword or a state code is present
+    if _US_KEYWORD_RE.search(loc_upper) or _US_STATE_RE.search(loc_upper):
         return True
 
-    # Check for state codes using regex to match whole words
-    # This avoids matching "CA" in "Canada"
-    if any(re.search(r'\b' + re.escape(code) + r'\b', loc_upper) for code in US_STATE_CODES):
-        return True
+    # Heuristic for "Remote" - non-US countries were already excluded above
+    return "REMOTE" in loc_upper
 
-    # Heuristic for "Remote" - include if it doesn't mention a non-US country
-    if "REMOTE" in loc_upper and not any(k.upper() in loc_upper for k in NON_US_KEYWORDS):
-        return True
+class RowFilter(NamedTuple):
+    """
+    One keep-predicate over a single JobTable column. `test` gets the column value
+    and returns True to keep the row. With memo=True it runs once per distinct
+    value (flags, ages, locations and companies repeat a lot), otherwise per row.
+    """
+    name: str
+    column: str
+    test: Callable[[object], bool]
+    cost: int = 1
+    memo: bool = True
 
-    # Default to excluding if no positive US indicators are found
-    return False
+class FilterEngine:
+    """
+    Runs RowFilters cheapest-first, each as one pass over the rows that survived
+    the previous filters, and records how many rows each filter dropped.
+    """
+    def __init__(self, filters: Iterable[RowFilter] = ()):
+        self.filters: List[RowFilter] = list(filters)
+        self.dropped: Dict[str, int] = {}
 
-def filter_rows(rows: List[Dict], applied_urls: Set[str], max_age_days: int) -> List[Dict]:
-    """Applies all filtering logic: age, location, applied status, and flags."""
-    out = []
-    for r in rows:
-        # 1. Filter out closed or advanced degree roles
-        if r.get("closed") or r.get("advanced_degree"):
-            continue
+    def add(self, f: RowFilter) -> None:
+        self.filters.append(f)
 
-        # 2. Filter out jobs already applied to
-        normalized_url = norm_url_for_dedupe(r["apply_url"])
-        if normalized_url in applied_urls:
-            continue
+    def run(self, table: JobTable) -> JobTable:
+        idx = list(range(len(table)))
+        for f in sorted(self.filters, key=lambda f: f.cost):
+            col = getattr(table, f.column)
+            if f.memo:
+                verdict: Dict = {}
+                for v in {col[i] for i in idx}:
+                    verdict[v] = f.test(v)
+                keep = [i for i in idx if verdict[col[i]]]
+            else:
+                test = f.test
+                keep = [i for i in idx if test(col[i])]
+            self.dropped[f.name] = len(idx) - len(keep)
+            idx = keep
+            if not idx:
+                break
+        return table.take(idx)
 
-        # 3. Filter jobs older than max_age_days
-        age = r.get("age")
-        if age is None or age > max_age_days:
-            continue
+def company_blocklist_filter(names: Iterable[str]) -> RowFilter:
+    blocked = {n.strip().lower() for n in names if n.strip()}
+    return RowFilter("company blocklist", "companies", lambda c: c.lower() not in blocked, cost=1)
 
-        # 4. Filter for US-only locations
-        if not is_us_location(r.get("location", "")):
-            continue
+def title_exclude_filter(patterns: Iterable[str]) -> RowFilter:
+    rx = re.compile("|".join(f"(?:{p})" for p in patterns), re.I)
+    return RowFilter("title regex", "titles", lambda t: not rx.search(t), cost=3)
+
+def default_filters(applied_urls: Container[str], max_age_days: int) -> List[RowFilter]:
+    drop = FLAG_BITS["closed"] | FLAG_BITS["advanced_degree"]
+    return [
+        # 1. closed or advanced degree roles
+        RowFilter("closed/advanced degree", "flags", lambda bits: not (bits & drop), cost=0),
+        # 2. jobs older than max_age_days (or with no parseable age)
+        RowFilter("age", "ages", lambda age: 0 <= age <= max_age_days, cost=0),
+        # 3. jobs already applied to; keys are unique per row, so no memo
+        RowFilter("already applied", "keys", lambda key: key not in applied_urls, cost=1, memo=False),
+        # 4. US-only locations
+        RowFilter("non-US location", "locations", is_us_location, cost=2),
+    ]
+
+def filter_rows(table: JobTable, applied_urls: Container[str], max_age_days: int,
+                extra: Iterable[RowFilter] = ()) -> JobTable:
+    """Applies all filtering logic: age, location, applied status, and flags, plus any extra filters."""
+    return FilterEngine(default_filters(applied_urls, max_age_days) + list(extra)).run(table)
 
-        out.append(r)
-    return out
-
-def sort_rows(rows: List[Dict]) -> List[Dict]:
-    def k(r: Dict) -> Tuple:
-        return (
-            0 if r.get("no_sponsorship") else 1,
-            0 if r.get("requires_us_citizenship") else 1,
-            0 if r.get("faang_plus") else 1,
-            (r.get("company") or "zzz").lower(),
-            (r.get("title") or "zzz").lower(),
-            (r.get("location") or "zzz").lower(),
-        )
-    return sorted(rows, key=k)
+def mark_dead_links(table: JobTable, cache: Optional[LinkCache] = None, scheduler: Optional[HostScheduler] = None) -> int:
+    """Check every apply link and set the closed flag on rows whose posting is gone; returns how many."""
+    status = check_links(table.urls, cache, scheduler)
+    dead = [i for i, url in enumerate(table.urls) if status[url].state == DEAD]
+    for i in dead:
+        table.set_flag(i, "closed")
+    return len(dead)
+
+def sort_rows(table: JobTable) -> JobTable:
+    lower: Dict[str, str] = {}
+    def low(s: str) -> str:
+        # company/location repeat a lot, so lowercase each distinct string once
+        v = lower.get(s)
+        if v is None:
+            v = lower[s] = (s or "zzz").lower()
+        return v
+    sort_keys = [
+        (_SORT_PRIO[bits], low(c), (t or "zzz").lower(), low(loc))
+        for bits, c, t, loc in zip(table.flags, table.companies, table.titles, table.locations)
+    ]
+    return table.take(sorted(range(len(table)), key=sort_keys.__getitem__))
 
 # ---------- Main ----------
 def main():
     parser = argparse.ArgumentParser(description="Scrape and filter new-grad SWE jobs.")
     parser.add_argument("--days", type=int, default=7, help="Max age of the job posting in days (default: 7).")
-    parser.add_argument("--applied", type=str, default="new_grad_swe_apply_links_applying.csv", help="CSV path with your applied jobs (Applied=TRUE).")
+    parser.add_argument("--applied", type=str, default="new_grad_swe_apply_links_applying.csv", help="CSV path with your applied jobs (Applied=TRUE); imported into --db once.")
+    parser.add_argument("--db", type=str, default=DB_FILE, help=f"Application store; jobs applied to in any imported export are filtered out (default: {DB_FILE}).")
+    parser.add_argument("--bloom", action="store_true", help="Check scraped links against a persisted Bloom filter of applied URLs first; only hits are looked up in --db.")
     parser.add_argument("--out", type=str, default="new_grad_swe_apply_links.csv", help="Output CSV path.")
     parser.add_argument("--archive-dir", type=str, default="past", help="Directory to archive the applied CSV into.")
     parser.add_argument("--no-archive", action="store_true", help="Don't archive the applied CSV after processing.")
+    parser.add_argument("--exclude-company", action="append", default=[], metavar="NAME", help="Drop rows from this company (case-insensitive; repeatable).")
+    parser.add_argument("--exclude-title", action="append", default=[], metavar="REGEX", help="Drop rows whose title matches this regex (case-insensitive; repeatable).")
+    parser.add_argument("--flag-phrases", type=str, default=None, help="JSON file of extra flag phrases, e.g. {\"closed\": [\"position filled\"]}.")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Directory for the README response cache (conditional GET). Disabled if omitted.")
+    parser.add_argument("--max-cache-age", type=float, default=None, help="Seconds a cached README is reused without revalidating (default: always revalidate).")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per request on 429/5xx or connection errors (default: 3).")
+    parser.add_argument("--backoff", type=float, default=0.5, help="First retry delay in seconds, doubled per retry (default: 0.5).")
+    parser.add_argument("--deadline", type=float, default=120.0, help="Total seconds allowed per README download, retries included (default: 120).")
+    parser.add_argument("--check-links", action="store_true", help="Request every kept apply link and drop postings that are gone (404/410 or an ATS 'not found' redirect).")
+    parser.add_argument("--link-concurrency", type=int, default=32, help="Link checks in flight at once (default: 32).")
+    parser.add_argument("--link-rate", type=float, default=5.0, help="Link checks per second per host (default: 5).")
+    parser.add_argument("--link-ttl", type=float, default=6 * 3600, help="Seconds a link check result is reused from --cache-dir (default: 21600).")
+    parser.add_argument("--sources", type=str, default=None, help="JSON list of job-list READMEs to scrape, e.g. [{\"name\": \"new-grad\", \"url\": \"...\", \"section\": \"Software Engineering New Grad Roles\"}] (default: SimplifyJobs New-Grad-Positions).")
+    parser.add_argument("--fuzzy-dedupe", action="store_true", help="Also drop near-duplicates: a row without an ATS job id that matches a kept row's company/title/location on another site.")
+    parser.add_argument("--html-backend", choices=HTML_BACKENDS, default="html.parser", help="Parser for HTML job tables; lxml is much faster on large tables (default: html.parser).")
     args = parser.parse_args()
+    if args.html_backend == "lxml" and etree is None:
+        parser.error("--html-backend lxml requires lxml (pip install lxml)")
 
     max_age_days = args.days
     applied_csv = args.applied
     out_csv = args.out
     archive_dir = args.archive_dir
     no_archive = args.no_archive
+    if args.flag_phrases:
+        try:
+            load_flag_phrases(args.flag_phrases)
+        except (OSError, ValueError) as e:
+            parser.error(f"--flag-phrases: {e}")
+    sources = list(DEFAULT_SOURCES)
+    if args.sources:
+        try:
+            sources = load_sources(args.sources)
+        except (OSError, ValueError) as e:
+            parser.error(f"--sources: {e}")
+    client = HttpClient(retries=args.retries, backoff=args.backoff, deadline=args.deadline, pool_size=max(len(sources), 1))
+    cache = FetchCache(args.cache_dir, args.max_cache_age) if args.cache_dir else None
+    row_caches: Dict[str, RowCache] = {}
+    def row_cache_for(source: Source) -> RowCache:
+        # one file per source: RowCache.update() replaces the whole set of lines
+        rc = row_caches[source.name] = RowCache(os.path.join(args.cache_dir, f"parsed_lines.{source.name}.json"),
+                                                f"{ROW_CACHE_VERSION}:{FLAG_MATCHER.signature()}")
+        return rc
 
-    # load applied URLs from the CSV you downloaded from Google Sheets
-    applied_urls = load_applied_urls(applied_csv)
-
-    # fetch and parse
-    rows = load_active_swe_rows()
-    rows = dedupe(rows)
-    rows = filter_rows(rows, applied_urls, max_age_days)
-    rows = sort_rows(rows)
+    # import the CSV you downloaded from Google Sheets; the store holds every export imported so far
+    store = ApplicationStore(args.db)
+    imported = store.import_file(applied_csv) if applied_csv and os.path.exists(applied_csv) else None
 
-    # Defaults & cleanup
-    for r in rows:
-        for k in ["no_sponsorship", "requires_us_citizenship", "faang_plus", "closed", "advanced_degree"]:
-            r.setdefault(k, False)
-        r["company"] = strip_flag_emojis(r.get("company", ""))
-        r["title"]   = strip_flag_emojis(r.get("title", ""))
-        if r.get("age") is None:
-            r["age"] = ""
+    # fetch and parse every source concurrently, then dedupe across them
+    t0 = time.perf_counter()
+    table, source_results = load_sources_rows(sources, cache, row_cache_for if args.cache_dir else None,
+                                              args.html_backend, client)
+    fetch_wall = time.perf_counter() - t0
+    for res in source_results:
+        if res.error is not None:
+            print(f"⚠️  Skipping source {res.source.name} ({res.source.url}): {res.error}", file=sys.stderr)
+    dedupe_dropped: Dict[str, int] = {}
+    table = dedupe(table, fuzzy=args.fuzzy_dedupe, dropped=dedupe_dropped)
+    extra_filters = []
+    if args.exclude_company:
+        extra_filters.append(company_blocklist_filter(args.exclude_company))
+    if args.exclude_title:
+        try:
+            extra_filters.append(title_exclude_filter(args.exclude_title))
+        except re.error as e:
+            parser.error(f"--exclude-title: {e}")
+    applied = BloomGuard(applied_bloom(store), store) if args.bloom else store
+    engine = FilterEngine(default_filters(applied, max_age_days) + extra_filters)
+    table = engine.run(table)
+    if args.check_links:
+        link_cache = LinkCache(os.path.join(args.cache_dir, "link_status.json") if args.cache_dir else None, args.link_ttl)
+        link_scheduler = HostScheduler(rate=args.link_rate, concurrency=args.link_concurrency)
+        try:
+            mark_dead_links(table, link_cache, link_scheduler)
+        finally:
+            link_scheduler.close()
+        link_cache.save()
+        before = len(table)
+        closed = FLAG_BITS["closed"]
+        table = table.select([not bits & closed for bits in table.flags])
+        engine.dropped["dead link"] = before - len(table)
+    table = sort_rows(table)
 
     # write output CSV
     with open(out_csv, "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=CSV_FIELDS)
         w.writeheader()
-        for r in rows:
+        for r in table.rows():
+            if r["age"] is None:
+                r["age"] = ""
             out = {k: r.get(k, "") for k in CSV_FIELDS}
             out["flags"] = flags_emoji_row(r)
+            out[KEY_COLUMN] = r["key"]
             w.writerow(out)
 
     # archive the applied CSV (move into past/ with incrementing suffix)
@@ -445,8 +1166,17 @@ def main():
         archived_path = archive_file(applied_csv, archive_dir, base)
 
     # Summary
-    print(f"✅ Wrote {len(rows)} new, filtered, direct ATS links to {out_csv}")
-    print(f"   - Used applied CSV: {applied_csv} (found {len(applied_urls)} applied entries).")
+    print(f"✅ Wrote {len(table)} new, filtered, direct ATS links to {out_csv}")
+    if imported is None:
+        print(f"   - No applied CSV at {applied_csv}; ", end="")
+    elif imported.skipped:
+        print(f"   - Applied CSV {applied_csv} was already imported; ", end="")
+    else:
+        print(f"   - Imported applied CSV {applied_csv} ({imported.rows} rows, {imported.new_jobs} new jobs); ", end="")
+    print(f"{args.db} has {len(store)} applied entries.")
+    if args.bloom:
+        print(f"   - Bloom filter: {applied.summary()}.")
+    store.close()
     if archived_path:
         print(f"   - Archived applied CSV to: {archived_path}")
     elif not no_archive:
@@ -454,6 +1184,18 @@ def main():
     else:
         print("   - Archiving skipped (--no-archive).")
     print(f"   - Kept only jobs in the US posted in the last {max_age_days} days.")
+    print(f"   - URL normalizations this run: {normalizations()}.")
+    print("   - Dropped: " + ", ".join(f"{n} {name}" for name, n in {**dedupe_dropped, **engine.dropped}.items()) + ".")
+    print(f"   - Sources ({fetch_wall:.2f}s wall): " + ", ".join(
+        f"{res.source.name} {'failed' if res.table is None else f'{len(res.table)} rows'} ({res.seconds:.2f}s)"
+        for res in source_results) + ".")
+    print(f"   - HTTP: {client.timings.summary()}.")
+    if args.check_links:
+        print("   - Link checks, busiest hosts: " + ("; ".join(link_scheduler.summary()) or "all cached") + ".")
+    if cache:
+        print(f"   - README cache: {cache.hits} hit(s) ({cache.revalidated} via 304), {cache.misses} miss(es).")
+    for name, row_cache in row_caches.items():
+        print(f"   - Table lines ({name}): {row_cache.added} added, {row_cache.removed} removed, {row_cache.unchanged} unchanged since last run.")
 
     # Ensure the master CSV has the tracking columns
     prepare_tracker.prepare_master_file(out_csv)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+scheduler.py
+
+HostScheduler runs blocking per-URL calls (link checks, enrichment) from asyncio
+without bursting any one host. Each request waits for, in order:
+  - a per-host slot (at most per_host in flight, matching the idle keep-alive
+    connections the client keeps per host),
+  - a global slot (at most `concurrency` in flight overall),
+  - a token from the host's bucket (`rate` per second, bursts up to `burst`).
+The token is taken last, right before sending, so the rate holds even when the
+global cap is the bottleneck. Per-host queue depth and latency are kept in
+HostStats.
+"""
+import asyncio
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from httpclient import HttpClient
+
+class TokenBucket:
+    """Reservation-style token bucket: reserve() returns how long to wait for the token it takes."""
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.updated: Optional[float] = None
+
+    def reserve(self, now: float) -> float:
+        if self.rate <= 0:
+            return 0.0
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        # tokens may go negative: later callers queue up behind earlier reservations
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, now: float, seconds: float) -> None:
+        """No tokens for `seconds` (e.g. after a 429 with Retry-After)."""
+        self.reserve(now)
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+class HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.queued = 0         # waiting for a slot or token right now
+        self.max_queued = 0
+        self.waited = 0.0       # seconds spent queued, summed
+        self.latency = 0.0      # seconds spent in the call, summed
+        self.max_latency = 0.0
+        self.paused = 0         # backoffs requested for this host
+
+    def avg_latency(self) -> float:
+        return self.latency / self.requests if self.requests else 0.0
+
+    def avg_wait(self) -> float:
+        return self.waited / self.requests if self.requests else 0.0
+
+class _Host:
+    def __init__(self, rate: float, burst: float, per_host: int):
+        self.bucket = TokenBucket(rate, burst)
+        self.slots = asyncio.Semaphore(per_host)
+        self.stats = HostStats()
+
+class HostScheduler:
+    """
+    rate/burst: token bucket per host (requests per second); per_host: in-flight
+    requests per host; concurrency: in-flight requests overall. Use from one event
+    loop at a time; call close() when done.
+    """
+    def __init__(self, rate: float = 5.0, burst: float = 1.0, concurrency: int = 32, per_host: int = 4,
+                 client: Optional[HttpClient] = None):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.per_host = per_host
+        # one pool per host, kept alive between requests; retries are left to the caller
+        # so that every attempt goes through the host's bucket
+        self.client = client or HttpClient(retries=0, pool_size=per_host, pool_hosts=256)
+        self.hosts: Dict[str, _Host] = {}
+        self._pool = ThreadPoolExecutor(max_workers=concurrency)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return (urllib.parse.urlsplit(url).hostname or "").lower()
+
+    def _host(self, host: str) -> _Host:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # asyncio primitives belong to one loop; stats carry over
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.concurrency)
+            for name, h in self.hosts.items():
+                stats = h.stats
+                h = self.hosts[name] = _Host(self.rate, self.burst, self.per_host)
+                h.stats = stats
+        h = self.hosts.get(host)
+        if h is None:
+            h = self.hosts[host] = _Host(self.rate, self.burst, self.per_host)
+        return h
+
+    async def run(self, url: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Call fn(*args) on a worker thread once url's host may take another request."""
+        loop = asyncio.get_running_loop()
+        h = self._host(self.host_of(url))
+        st = h.stats
+        st.queued += 1
+        st.max_queued = max(st.max_queued, st.queued)
+        t0 = loop.time()
+        async with h.slots, self._slots:
+            delay = h.bucket.reserve(loop.time())
+            if delay > 0:
+                await asyncio.sleep(delay)
+            st.queued -= 1
+            t1 = loop.time()
+            st.waited += t1 - t0
+            try:
+                return await loop.run_in_executor(self._pool, fn, *args)
+            finally:
+                took = loop.time() - t1
+                st.requests += 1
+                st.latency += took
+                st.max_latency = max(st.max_latency, took)
+
+    def backoff(self, url: str, seconds: float) -> None:
+        """Hold back every request to url's host for `seconds`."""
+        h = self._host(self.host_of(url))
+        h.stats.paused += 1
+        h.bucket.pause(asyncio.get_running_loop().time(), seconds)
+
+    def summary(self, top: int = 3) -> List[str]:
+        """One line per host, busiest first."""
+        busiest = sorted(self.hosts.items(), key=lambda kv: kv[1].stats.requests, reverse=True)[:top]
+        return [f"{host}: {h.stats.requests} req, queue max {h.stats.max_queued}, "
+                f"wait avg {h.stats.avg_wait() * 1000:.0f}ms, latency avg {h.stats.avg_latency() * 1000:.0f}ms "
+                f"/ max {h.stats.max_latency * 1000:.0f}ms" + (f", {h.stats.paused} backoff(s)" if h.stats.paused else "")
+                for host, h in busiest]
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        self.client.close()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+snapshot.py
+
+Read-only binary snapshot of the application store, for the analysis scripts.
+Opening it is a stat() of the exports plus an mmap: no CSV parsing and no
+SQLite. Columns are fixed-width arrays read straight out of the mapping, so
+a script only touches the columns it uses.
+
+The snapshot is rebuilt from applications.db when any export it covers, or
+the store itself, has a different mtime/size than when it was written.
+
+Layout (little-endian, every section 8-byte aligned):
+    header      magic, version, n jobs, n strings, blob bytes, meta bytes
+    meta        JSON: source file stats, funnel counts
+    index       u64[n] key hashes, sorted  +  u32[n] job number of each hash
+    columns     u32[n] string ids for key, apply_url, company, title, status; u8[n] applied
+    strings     u32[m + 1] offsets into the UTF-8 blob (each distinct string stored once)
+"""
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from appstore import DB_FILE, ApplicationStore
+
+MAGIC = b"JOBSNAP\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIQQ")
+STRING_COLUMNS = ("key", "apply_url", "company", "title", "status")
+
+def snapshot_path(db_path: str = DB_FILE) -> str:
+    """applications.db -> applications.snap"""
+    return os.path.splitext(db_path)[0] + ".snap"
+
+def key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+def _file_stat(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+def _pad(n: int) -> int:
+    return -n % 8
+
+# ---------------- Writing ----------------
+def write_snapshot(store: ApplicationStore, path: str, sources: Dict[str, List[int]]) -> None:
+    """Dump the store's jobs (in import order) to path, atomically."""
+    strings: Dict[str, int] = {}
+    def sid(s: str) -> int:
+        i = strings.get(s)
+        if i is None:
+            i = strings[s] = len(strings)
+        return i
+    cols = {name: array("I") for name in STRING_COLUMNS}
+    applied = bytearray()
+    hashes = []
+    for row in store.db.execute("SELECT key, apply_url, company, title, status, applied FROM jobs ORDER BY rowid"):
+        hashes.append((key_hash(row[0]), len(applied)))
+        for name, value in zip(STRING_COLUMNS, row):
+            cols[name].append(sid(value))
+        applied.append(1 if row[5] else 0)
+    n = len(applied)
+    hashes.sort()
+    index_hashes = array("Q", (h for h, _ in hashes))
+    index_rows = array("I", (i for _, i in hashes))
+    blob = bytearray()
+    offsets = array("I", [0])
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    meta = json.dumps({
+        "sources": sources,
+        "built_at": time.time(),
+        "status_counts": store.status_counts(),
+        "company_counts": store.company_counts(),
+    }).encode("utf-8")
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, n, len(strings), len(blob), len(meta)))
+        for part in (meta, index_hashes.tobytes(), index_rows.tobytes(),
+                     *(cols[name].tobytes() for name in STRING_COLUMNS), bytes(applied),
+                     offsets.tobytes(), bytes(blob)):
+            f.write(part)
+            f.write(b"\0" * _pad(len(part)))
+    os.replace(tmp, path)
+
+# ---------------- Reading ----------------
+class Snapshot:
+    """
+    An mmapped snapshot, answering the same queries as ApplicationStore. `key in snap`
+    is true for applied jobs (binary search on the hash index); column(name) is a
+    zero-copy view of one column. Funnel counts are the store's, as of the build.
+    """
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, m, blob_len, meta_len = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: not a version {VERSION} snapshot")
+        self.n = n
+        buf = memoryview(self._mm)
+        pos = HEADER.size
+        def section(nbytes: int) -> memoryview:
+            nonlocal pos
+            view = buf[pos:pos + nbytes]
+            pos += nbytes + _pad(nbytes)
+            return view
+        self.meta = json.loads(bytes(section(meta_len)))
+        self._hashes = section(8 * n).cast("Q")
+        self._rows = section(4 * n).cast("I")
+        self._columns = {name: section(4 * n).cast("I") for name in STRING_COLUMNS}
+        self._columns["applied"] = section(n)
+        self._offsets = section(4 * (m + 1)).cast("I")
+        self._blob = section(blob_len)
+        self._views = [buf, self._hashes, self._rows, *self._columns.values(), self._offsets, self._blob]
+
+    def close(self) -> None:
+        for view in self._views:
+            view.release()
+        self._mm.close()
+
+    def __len__(self) -> int:
+        return self.applied_count()
+
+    def job_count(self) -> int:
+        return self.n
+
+    def string(self, i: int) -> str:
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    def column(self, name: str) -> memoryview:
+        """String ids (or 0/1 for 'applied') of every job, in import order."""
+        return self._columns[name]
+
+    def find(self, key: str) -> int:
+        """Job number of key, or -1."""
+        h = key_hash(key)
+        i = bisect.bisect_left(self._hashes, h)
+        keys = self._columns["key"]
+        while i < self.n and self._hashes[i] == h:
+            row = self._rows[i]
+            if self.string(keys[row]) == key:
+                return row
+            i += 1
+        return -1
+
+    def __contains__(self, key: str) -> bool:
+        row = self.find(key)
+        return row >= 0 and bool(self._columns["applied"][row])
+
+    def applied_count(self) -> int:
+        return sum(self.meta["status_counts"].values())
+
+    def status_counts(self) -> Dict[str, int]:
+        return dict(self.meta["status_counts"])
+
+    def company_counts(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        return [tuple(c) for c in self.meta["company_counts"][:limit]]
+
+    def applied_jobs(self, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        return self.rows(("company", "title", "apply_url", "status"), applied_only=True, limit=limit)
+
+    def rows(self, columns: Sequence[str], applied_only: bool = False, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """Jobs as dicts of the requested string columns, in import order."""
+        flags = self._columns["applied"]
+        cols = [(name, self._columns[name]) for name in columns]
+        out = []
+        for row in range(self.n):
+            if limit is not None and len(out) >= limit:
+                break
+            if applied_only and not flags[row]:
+                continue
+            out.append({name: self.string(col[row]) for name, col in cols})
+        return out
+
+# ---------------- Open or rebuild ----------------
+def open_snapshot(paths: Iterable[str], db_path: str = DB_FILE, path: Optional[str] = None,
+                  workers: int = 1) -> Tuple[Snapshot, bool]:
+    """
+    The snapshot for these exports, and whether it had to be rebuilt. It is reused
+    when every export and the store still have the mtime/size recorded in it;
+    otherwise new exports are imported into the store and the snapshot rewritten.
+    """
+    path = path or snapshot_path(db_path)
+    wanted = {p: st for p in paths if (st := _file_stat(p)) is not None}
+    if os.path.exists(path):
+        try:
+            snap = Snapshot(path)
+        except (OSError, ValueError, struct.error):
+            snap = None
+        if snap is not None:
+            sources = snap.meta["sources"]
+            if sources.get(db_path) == _file_stat(db_path) and all(sources.get(p) == st for p, st in wanted.items()):
+                return snap, False
+            snap.close()
+    store = ApplicationStore(db_path)
+    try:
+        store.sync(wanted, workers)
+        store.refresh_funnel()
+        # stats of everything the store has imported, so other scripts' sets of exports stay warm too
+        sources = {p: [m, sz] for p, m, sz in store.db.execute("SELECT path, mtime_ns, size FROM files ORDER BY id")}
+        sources.update(wanted)
+        sources[db_path] = _file_stat(db_path)     # taken after the last write to the store
+        write_snapshot(store, path, sources)
+    finally:
+        store.close()
+    return Snapshot(path), True
@@ -0,0 +1,46 @@
+"""
+Tests for bloom: run with `python -m pytest`.
+"""
+import csv
+import os
+
+from appstore import ApplicationStore
+from bloom import BloomGuard, applied_bloom, bloom_path
+from urlnorm import canonical_key
+
+def write_export(path, urls):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["company", "apply_url", "Applied"])
+        for u in urls:
+            w.writerow(["X", u, "TRUE"])
+
+def store_from(tmp_path, name, urls):
+    export = tmp_path / f"{name}.csv"
+    write_export(export, urls)
+    store = ApplicationStore(str(tmp_path / "applications.db"))
+    store.import_file(str(export))
+    return store
+
+def test_filter_catches_up_with_new_applied_jobs(tmp_path):
+    store = store_from(tmp_path, "a", ["https://x.io/1", "https://x.io/2"])
+    applied_bloom(store)
+    write_export(tmp_path / "b.csv", ["https://x.io/3"])
+    store.import_file(str(tmp_path / "b.csv"))
+    guard = BloomGuard(applied_bloom(store), store)
+    assert all(canonical_key(f"https://x.io/{i}") in guard for i in (1, 2, 3))
+    store.close()
+
+def test_filter_of_a_recreated_store_is_rebuilt(tmp_path):
+    store = store_from(tmp_path, "a", ["https://x.io/1", "https://x.io/2"])
+    applied_bloom(store)
+    store.close()
+    # a new store with as many events as the filter has seen, or more
+    os.remove(tmp_path / "applications.db")
+    store = store_from(tmp_path, "b", ["https://x.io/2", "https://x.io/3", "https://x.io/4"])
+    assert os.path.exists(bloom_path(store.path))
+    guard = BloomGuard(applied_bloom(store), store)
+    for i in (2, 3, 4):
+        key = canonical_key(f"https://x.io/{i}")
+        assert key in store and key in guard
+    store.close()
@@ -0,0 +1,44 @@
+"""
+Tests for httpclient: run with `python -m pytest`.
+"""
+import http.server
+import socket
+import threading
+
+import pytest
+
+from httpclient import HttpClient
+
+@pytest.fixture
+def server():
+    """A local HTTP server on 127.0.0.1 that answers every GET with 'ok'."""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+        def log_message(self, *args):
+            pass
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+# ---------- connecting ----------
+def test_get_falls_back_to_next_address(server, monkeypatch):
+    """A host whose first address refuses the connection is reached on its second one."""
+    port = server.server_port
+    def getaddrinfo(host, *args, **kwargs):
+        # the name has two addresses and nothing listens on 127.0.0.2; an address resolves to itself
+        addrs = ("127.0.0.2", "127.0.0.1") if host == "dual-stack.test" else (host,)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (addr, port)) for addr in addrs]
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    client = HttpClient(retries=0)
+    try:
+        r = client.get(f"http://dual-stack.test:{port}/")
+    finally:
+        client.close()
+    assert r.status_code == 200 and r.content == b"ok"
+    assert client.timings.connections == 1
@@ -0,0 +1,162 @@
+"""
+Tests for pull_apply_links' classifiers and parsers: run with `python -m pytest`.
+"""
+import json
+
+import pytest
+
+import pull_apply_links
+from fixtures import (LOCATION_CORPUS, clean_md_text_reference, detect_flags_reference, is_us_location_reference,
+                      strip_flag_emojis_reference, synthetic_html_table, synthetic_readme)
+
+# ---------- is_us_location ----------
+@pytest.mark.parametrize("location", LOCATION_CORPUS)
+def test_is_us_location_matches_reference(location):
+    """The compiled, memoized classifier agrees with the original per-call implementation."""
+    assert pull_apply_links.is_us_location(location) == is_us_location_reference(location)
+
+# ---------- age_to_days ----------
+# Every age spelling the upstream README has used, with the expected day count
+AGE_CASES = [
+    ("0d", 0), ("1d", 1), ("3d", 3), ("12h", 0), ("1h", 0), ("2w", 14), ("1mo", 30), ("3mo", 90), ("1y", 365),
+    ("1 day", 1), ("3 days", 3), ("1 hour", 0), ("5 hours", 0), ("1 hr", 0), ("2 hrs", 0),
+    ("1 week", 7), ("2 weeks", 14), ("3 wk", 21), ("2 wks", 14), ("1 month", 30), ("4 months", 120),
+    ("1 mth", 30), ("2 mths", 60), ("6mos", 180), ("1 year", 365), ("2 years", 730), ("1 yr", 365), ("3 yrs", 1095),
+    ("0D", 0), (" 5d ", 5), ("10d ago", 10), ("", None), ("today", None), ("new", None), (None, None),
+]
+
+@pytest.mark.parametrize("raw,expected", AGE_CASES)
+def test_age_to_days(raw, expected):
+    assert pull_apply_links.age_to_days(raw) == expected
+
+# ---------- flag phrases ----------
+@pytest.mark.parametrize("phrases", [
+    ["no visa"],                                # not an object
+    {"closed": "position filled"},              # a bare string, not a list
+    {"closed": ["position filled", ""]},        # an empty phrase
+    {"closed": ["position filled", "  "]},
+    {"closed": ["position filled", 3]},
+    {"hiring_freeze": ["hiring freeze"]},       # not a flag
+])
+def test_load_flag_phrases_rejects_bad_shapes(tmp_path, phrases):
+    path = tmp_path / "flags.json"
+    path.write_text(json.dumps(phrases), encoding="utf-8")
+    before = pull_apply_links.FLAG_MATCHER.signature()
+    with pytest.raises(ValueError):
+        pull_apply_links.load_flag_phrases(str(path))
+    assert pull_apply_links.FLAG_MATCHER.signature() == before
+    assert not pull_apply_links.detect_flags("Software Engineer at Acme")["closed"]
+
+@pytest.mark.parametrize("phrases,text,expected", [
+    # a phrase of one flag running into a phrase of another
+    ({"no_sponsorship": ["no visa"], "closed": ["visa sponsorship ended"]}, "no visa sponsorship ended",
+     {"no_sponsorship", "closed"}),
+    ({"closed": ["role closed"], "advanced_degree": ["closed-loop phd"]}, "role closed-loop phd",
+     {"closed", "advanced_degree"}),
+    # nested and repeated phrases
+    ({"closed": ["posting closed"], "faang_plus": ["closed"]}, "posting closed", {"closed", "faang_plus"}),
+    ({"closed": ["aa"], "faang_plus": ["aab"]}, "aaab", {"closed", "faang_plus"}),
+])
+def test_flag_matcher_finds_overlapping_phrases(phrases, text, expected):
+    assert pull_apply_links.FlagMatcher(phrases).match(text) == expected
+
+def readme_row_texts(n_rows):
+    lines = [ln for ln in synthetic_readme(n_rows).splitlines() if ln.startswith("| ") and "---" not in ln]
+    return [" ".join(c.strip() for c in ln.strip("|").split("|")) for ln in lines]
+
+def test_detect_flags_matches_reference():
+    """The trie regex flags the same rows as a substring scan per phrase."""
+    texts = readme_row_texts(500) + ["no visa sponsorship", "Closed — MS or PhD required", "h1b NOT available"]
+    assert [pull_apply_links.detect_flags(t) for t in texts] == [detect_flags_reference(t) for t in texts]
+
+def test_detect_flags_matches_reference_with_extra_phrases(monkeypatch):
+    phrases = {k: list(v) for k, v in pull_apply_links.FLAG_PHRASES.items()}
+    big = {k: words + [f"{w} {i}" for w in words for i in range(10)] for k, words in phrases.items()}
+    matcher = pull_apply_links.FlagMatcher({k: [e] for e, k in pull_apply_links.FLAG_EMOJIS.items()})
+    matcher.add(big)
+    monkeypatch.setattr(pull_apply_links, "FLAG_MATCHER", matcher)
+    texts = readme_row_texts(500) + [f"{words[0]} {i}" for words in big.values() for i in (3, 10)]
+    assert [pull_apply_links.detect_flags(t) for t in texts] == [detect_flags_reference(t, big) for t in texts]
+
+# ---------- README slicing ----------
+HEADERLESS_HTML_README = """# Jobs
+
+<table>
+<thead><tr><th>Company</th><th>Role</th><th>Location</th><th>Application</th><th>Age</th></tr></thead>
+<tbody>
+<tr>
+<td><strong>Acme</strong></td>
+<td>Software Engineer</td>
+<td>New York, NY</td>
+<td><a href="https://boards.greenhouse.io/acme/jobs/1?utm_source=Simplify"><img src="apply.png" alt="Apply"></a></td>
+<td>2d</td>
+</tr>
+<tr>
+<td>↳</td>
+<td>Backend Engineer</td>
+<td>Remote in USA</td>
+<td><a href="https://jobs.lever.co/acme/abc123"><img src="apply.png" alt="Apply"></a></td>
+<td>5d</td>
+</tr>
+</tbody>
+</table>
+"""
+
+def test_headerless_html_readme_is_parsed_whole():
+    """Without the section header the whole document is parsed, streaming or not."""
+    full = pull_apply_links.parse_markdown_table(pull_apply_links.extract_active_swe(HEADERLESS_HTML_README))
+    streamed = list(pull_apply_links.iter_markdown_rows(
+        pull_apply_links.iter_active_swe(HEADERLESS_HTML_README.splitlines())))
+    assert [r["apply_url"] for r in streamed] == [
+        "https://boards.greenhouse.io/acme/jobs/1", "https://jobs.lever.co/acme/abc123"]
+    assert [r["company"] for r in streamed] == ["Acme", "Acme"]
+    assert streamed == full
+
+def test_streamed_readme_matches_full_parse():
+    readme = synthetic_readme(500)
+    full = pull_apply_links.parse_markdown_table(pull_apply_links.extract_active_swe(readme))
+    streamed = list(pull_apply_links.iter_markdown_rows(pull_apply_links.iter_active_swe(readme.splitlines())))
+    assert len(full) > 400      # rows without an apply link are skipped
+    assert streamed == full
+
+# ---------- cell cleanup ----------
+def test_clean_md_cell_matches_reference():
+    """The fused cleanup gives the same text as clean_md_text followed by strip_flag_emojis."""
+    lines = [ln for ln in synthetic_readme(500).splitlines() if ln.startswith("| ") and "---" not in ln]
+    cells = [c.strip() for ln in lines for c in ln.strip("|").split("|")[:3]]
+    cells += ["[Hooli](https://hooli.com) 🔥  Inc", "SWE 🇺🇸 🛂", "", "  spaced\tout  "]
+    for cell in cells:
+        assert pull_apply_links.clean_md_cell(cell) == strip_flag_emojis_reference(clean_md_text_reference(cell))
+        assert pull_apply_links.clean_md_text(cell) == clean_md_text_reference(cell)
+
+# ---------- HTML fragment scanning ----------
+@pytest.mark.parametrize("fragment", [
+    '<a href="https://boards.greenhouse.io/acme/jobs/1?utm_source=Simplify&amp;ref=simplify">'
+    '<img src="https://i.imgur.com/u1vyNQ9.png" width="118" alt="Apply"></a>',
+    '<a href="https://simplify.jobs/p/1"><img src="x.png" alt="Simplify"></a> 🔒',
+    "<strong>Acme</strong> 🔥",
+    "Seattle, WA</br>Boston, MA",
+    "<details><summary>**4 locations**</summary>Austin, TX</br>Dallas, TX</details>",
+    "AT&amp;T &lt;3 &copy; &#169; &#xA9;",
+    "AT&T",
+    "<img alt=\"it's\"> x",
+    "<!-- hidden --> text",
+    "a < b > c",
+    # malformed: a character reference without its ';', an unterminated attribute quote
+    "x &ampy z",
+    "&lt;3 &copy",
+    '<a href="u>x</a>',
+    "<a href='u>x</a>",
+    '<td class="x>Acme</td>',
+])
+def test_scan_html_fragment_matches_bs4(fragment):
+    assert pull_apply_links.scan_html_fragment(fragment) == pull_apply_links._scan_html_fragment_bs4(fragment)
+
+# ---------- HTML tables ----------
+def test_parse_html_table_lxml_matches_html_parser():
+    """The lxml tree walk returns the same rows as the bs4 html.parser path."""
+    pytest.importorskip("lxml")
+    fragment = synthetic_html_table(300)
+    rows = pull_apply_links.parse_html_table(fragment, "lxml")
+    assert len(rows) > 200
+    assert rows == pull_apply_links.parse_html_table(fragment, "html.parser")
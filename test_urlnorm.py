@@ -0,0 +1,39 @@
+"""
+Tests for urlnorm: run with `python -m pytest`.
+"""
+import pytest
+
+import urlnorm
+
+URLS = [
+    "https://boards.greenhouse.io/acme/jobs/123?utm_source=Simplify&ref=simplify",
+    "HTTPS://Boards.Greenhouse.io/Acme/jobs/9/",
+    "https://boards.greenhouse.io/embed/job_app?for=Acme&token=123&utm_campaign=z",
+    "https://careers.initech.com/job/7?gh_jid=7",
+    "https://jobs.lever.co/globex/0a1b2c3d-1111-2222-3333-444455556666/apply?utm_campaign=simplify",
+    "https://acme.wd5.myworkdayjobs.com/en-US/Careers/job/New-York/SWE_R-123/apply?source=LinkedIn",
+    "https://x.brassring.com/tgnewui/search/home/home?partnerid=1&siteid=2#jobDetails=555_2",
+    "https://x.com/a;jsessionid=1?utm_source=x",
+    "https://x.com/a?a=&b=2&utm_z=3",
+    "https://x.com/path%20a/?q=a+b&r=%2F",
+    "careers.acme.com/job?gh_jid=1",
+    "http://[abc/x",
+    "",
+]
+
+@pytest.mark.parametrize("url", URLS)
+def test_parse_url_matches_the_separate_helpers(url):
+    parsed = urlnorm.parse_url(url)
+    assert parsed.url == urlnorm.strip_tracking(url)
+    assert parsed.key == urlnorm.norm_url(urlnorm.strip_tracking(url))
+    assert parsed.key == urlnorm.canonical_key(parsed.url)
+    assert parsed.job == urlnorm.ats_job(parsed.url)
+
+def test_each_url_is_parsed_once():
+    urlnorm._URL_MEMO.clear()
+    before = urlnorm.normalizations()
+    for u in URLS[:10]:
+        # everything the scraper derives from a URL, and again from its stripped form
+        p = urlnorm.parse_url(u)
+        urlnorm.canonical_key(u), urlnorm.ats_job(u), urlnorm.ats_job(p.url), urlnorm.canonical_key(p.url)
+    assert urlnorm.normalizations() - before == 10
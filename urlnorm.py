@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+urlnorm.py
+
+URL canonicalization shared by pull_apply_links, compare_applied and
+detailed_analysis. canonical_key() is the single dedupe/comparison key:
+tracking params stripped, scheme+netloc lowercased, trailing slash dropped.
+parse_url() splits a URL once and derives everything the scripts need from
+that one parse: the tracking-stripped URL, canonical_key() and the ATS job.
+It is memoized, since the same archive URLs come back on every run.
+
+ats_job() goes one step further for the ATS families pull_apply_links
+whitelists: it pulls the (ats, tenant, job_id) triple out of the URL, so path
+variants of one posting (Workday locale/location segments, greenhouse board vs.
+gh_jid links, lever /apply, ...) share a key.
+"""
+import re
+import threading
+import urllib.parse
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+CACHE_SIZE = 1 << 17
+# Hidden trailing CSV column where pull_apply_links stores canonical_key(apply_url),
+# so downstream scripts can reuse it instead of re-parsing the URL.
+KEY_COLUMN = "_key"
+
+_parse_lock = threading.Lock()
+_parses = 0     # URLs split by this module, see normalizations()
+
+def _urlparse(u: str) -> urllib.parse.ParseResult:
+    global _parses
+    with _parse_lock:
+        _parses += 1
+    return urllib.parse.urlparse(u)
+
+def _tracking_free(query: str) -> List[tuple]:
+    keep = []
+    for k, v in urllib.parse.parse_qsl(query, keep_blank_values=True):
+        lk, lv = (k or "").lower(), (v or "").lower()
+        if lk.startswith("utm_"):
+            continue
+        if "simplify" in lk or "simplify" in lv:
+            continue
+        keep.append((k, v))
+    return keep
+
+def strip_tracking(u: str) -> str:
+    """Remove common tracking UTM params and 'simplify' keys/values from a URL."""
+    u = (u or "").strip()
+    if not u:
+        return ""
+    try:
+        p = _urlparse(u)
+    except Exception:
+        return u
+    if not p.query:
+        # return full url (including scheme/netloc/path)
+        return urllib.parse.urlunparse(p._replace(query=""))
+    q = urllib.parse.urlencode(_tracking_free(p.query))
+    out = urllib.parse.urlunparse(p._replace(query=q))
+    if not q:
+        # remove the trailing ? etc
+        out = f"{p.scheme}://{p.netloc}{p.path}"
+    return out
+
+def norm_url(u: str) -> str:
+    """Normalize URL for stable dedupe/comparison: lower scheme+netloc, strip trailing slash on path, keep query."""
+    u = (u or "").strip()
+    try:
+        p = _urlparse(u)
+        scheme = (p.scheme or "https").lower()
+        netloc = (p.netloc or "").lower()
+        path = (p.path or "").rstrip("/")
+        # keep query as-is (sometimes query has identifying token), but strip tracking earlier
+        query = p.query or ""
+        return urllib.parse.urlunparse((scheme, netloc, path, "", query, ""))
+    except Exception:
+        return u.rstrip("/").lower()
+
+def canonical_key(u: str) -> str:
+    """The key every script dedupes and compares on: norm_url(strip_tracking(u)), via parse_url()."""
+    return parse_url(u).key
+
+def normalizations() -> int:
+    """How many URLs were actually parsed this process (memo hits excluded)."""
+    return _parses
+
+def canonical_keys(urls: Iterable[str]) -> List[str]:
+    """canonical_key() over a batch; repeats within the batch cost one dict lookup."""
+    seen: Dict[str, str] = {}
+    out = []
+    for u in urls:
+        key = seen.get(u)
+        if key is None:
+            key = seen[u] = canonical_key(u or "")
+        out.append(key)
+    return out
+
+# ---------------- ATS job identity ----------------
+class AtsJob(NamedTuple):
+    ats: str
+    tenant: str     # board / company id on the ATS, lowercased ("" when the URL doesn't say)
+    job_id: str
+
+    @property
+    def key(self) -> str:
+        # greenhouse job ids are global, so a gh_jid link on the company's own site needs no tenant
+        if self.ats == "greenhouse":
+            return f"greenhouse::{self.job_id}"
+        return f"{self.ats}:{self.tenant}:{self.job_id}"
+
+# (ats, host suffix, path regex with tenant/job groups); the first match wins
+_ATS_PATHS = (
+    ("greenhouse", "greenhouse.io", re.compile(r"^/(?P<tenant>[^/]+)/jobs/(?P<job>\d+)")),
+    # lever/ashby posting ids are UUIDs; any hex id segment is accepted
+    ("lever", "lever.co", re.compile(r"^/(?P<tenant>[^/]+)/(?P<job>[0-9a-f][0-9a-f-]*)(?:/|$)", re.I)),
+    ("ashby", "ashbyhq.com", re.compile(r"^/(?P<tenant>[^/]+)/(?P<job>[0-9a-f][0-9a-f-]*)(?:/|$)", re.I)),
+    ("workable", "workable.com", re.compile(r"^/(?P<tenant>[^/]+)/j/(?P<job>[0-9a-z]+)", re.I)),
+    ("smartrecruiters", "smartrecruiters.com", re.compile(r"^/(?P<tenant>[^/]+)/(?P<job>\d+)")),
+    # myworkdaysite.com/recruiting/<tenant>/<site>/job/...
+    ("workday", "myworkdaysite.com", re.compile(r"^/(?:[a-z]{2}-[a-z]{2}/)?recruiting/(?P<tenant>[^/]+)/[^/]+/(?:details|job)/(?:.*/)?[^/]*_(?P<job>[^/_]+?)(?:/|$)", re.I)),
+    ("dayforce", "dayforcehcm.com", re.compile(r"^/(?:[a-z]{2}-[a-z]{2}/)?(?P<tenant>[^/]+)/[^/]+/jobs/(?P<job>\d+)", re.I)),
+)
+# Workday: <tenant>.wd<N>.myworkdayjobs.com/[<locale>/]<site>/job/[<location>/]<Title>_<REQ ID>[/apply...]
+_WORKDAY_JOB_RE = re.compile(r"/(?:job|details)/(?:.*/)?[^/]*_(?P<job>[^/_]+?)(?:/|$)", re.I)
+_ICIMS_JOB_RE = re.compile(r"^/jobs/(?P<job>\d+)")
+_EIGHTFOLD_JOB_RE = re.compile(r"/job/(?P<job>\d+)")
+
+def _ats_job(host: str, path: str, q: Dict[str, str], fragment: str) -> Optional[AtsJob]:
+    for ats, suffix, rx in _ATS_PATHS:
+        if host == suffix or host.endswith("." + suffix):
+            m = rx.match(path)
+            if m:
+                return AtsJob(ats, m.group("tenant").lower(), m.group("job").lower())
+    if host.endswith("greenhouse.io") and q.get("token", "").isdigit():
+        # boards.greenhouse.io/embed/job_app?for=<tenant>&token=<id>
+        return AtsJob("greenhouse", q.get("for", "").lower(), q["token"])
+    if q.get("gh_jid", "").isdigit():
+        # greenhouse board embedded on the company's own careers site
+        return AtsJob("greenhouse", "", q["gh_jid"])
+    if host.endswith(".myworkdayjobs.com"):
+        m = _WORKDAY_JOB_RE.search(path)
+        if m:
+            return AtsJob("workday", host.split(".", 1)[0], m.group("job").lower())
+    if host.endswith(".icims.com"):
+        m = _ICIMS_JOB_RE.match(path)
+        if m:
+            # careers-<tenant>.icims.com
+            return AtsJob("icims", host.split(".", 1)[0].removeprefix("careers-"), m.group("job"))
+    if host.endswith(".taleo.net") and q.get("job"):
+        return AtsJob("taleo", host.split(".", 1)[0], q["job"].lower())
+    if host.endswith(".eightfold.ai"):
+        job = q.get("pid") or (m.group("job") if (m := _EIGHTFOLD_JOB_RE.search(path)) else "")
+        if job:
+            return AtsJob("eightfold", host.split(".", 1)[0], job)
+    if "successfactors" in host and q.get("career_job_req_id"):
+        return AtsJob("successfactors", q.get("company", "").lower(), q["career_job_req_id"])
+    if "workforcenow" in host and q.get("jobid"):
+        return AtsJob("adp", q.get("cid", "").lower(), q["jobid"].lower())
+    if "brassring" in host:
+        # the job id lives in the fragment: ...#jobDetails=<id>_<site>
+        m = re.search(r"jobdetails=(\d+)", fragment, re.I)
+        if m:
+            return AtsJob("brassring", q.get("partnerid", ""), m.group(1))
+    return None
+
+
+def ats_job(u: str) -> Optional[AtsJob]:
+    """(ats, tenant, job_id) of a posting URL on a known ATS, or None when it isn't recognized."""
+    return parse_url(u).job
+
+def job_key(u: str) -> str:
+    """The dedupe key for one posting: its ATS job identity when recognized, else canonical_key(u)."""
+    job = ats_job(u)
+    return job.key if job is not None else canonical_key(u)
+
+# ---------------- One parse per URL ----------------
+class ParsedUrl(NamedTuple):
+    url: str                # strip_tracking(u)
+    key: str                # canonical_key(u)
+    host: str               # lowercased hostname ("" when there is none)
+    job: Optional[AtsJob]   # ats_job(u)
+
+_URL_MEMO: Dict[str, ParsedUrl] = {}
+
+def parse_url(u: str) -> ParsedUrl:
+    """Everything derived from one URL, from a single urlparse (memoized)."""
+    try:
+        return _URL_MEMO[u]
+    except KeyError:
+        pass
+    parsed = _parse_url(u)
+    if len(_URL_MEMO) >= 2 * CACHE_SIZE:     # up to two entries (raw and stripped) per URL
+        _URL_MEMO.clear()
+    _URL_MEMO[u] = parsed
+    # stripping is idempotent, so the stripped URL (what rows store) parses to the same thing
+    _URL_MEMO.setdefault(parsed.url, parsed)
+    return parsed
+
+def _parse_url(u: str) -> ParsedUrl:
+    s = (u or "").strip()
+    try:
+        p = _urlparse(s) if s else None
+    except ValueError:
+        p = None
+    if p is None or p.scheme not in ("http", "https") or not p.netloc:
+        # not an absolute web URL: strip_tracking/norm_url's own fallbacks decide
+        url = strip_tracking(s)
+        job = None if p is None else _ats_job(
+            p.hostname or "", p.path, {k.lower(): v for k, v in _tracking_free(p.query) if v}, p.fragment)
+        return ParsedUrl(url, norm_url(url), "", job)
+    keep = _tracking_free(p.query) if p.query else []
+    q = urllib.parse.urlencode(keep)
+    if p.query and not q:
+        # as strip_tracking: a query that was all tracking goes, with the params and fragment
+        p = p._replace(params="", query="", fragment="")
+        url = f"{p.scheme}://{p.netloc}{p.path}"
+    else:
+        p = p._replace(query=q)
+        url = urllib.parse.urlunparse(p)
+    # norm_url(url) without parsing url again
+    key = urllib.parse.urlunparse((p.scheme, p.netloc.lower(), p.path.rstrip("/"), "", q, ""))
+    host = p.hostname or ""
+    path = p.path + (";" + p.params if p.params else "")
+    job = _ats_job(host, path, {k.lower(): v for k, v in keep if v}, p.fragment)
+    return ParsedUrl(url, key, host, job)